@@ -5,8 +5,144 @@ Creates detailed, educational Telegram alerts explaining WHY each signal trigger
 Includes volume flow analysis, EMA details, breakout mechanics, and trade reasoning.
 """
 
+import math
+from functools import lru_cache
+
 from enhanced_signals import EnhancedSignal
 
+# Section divider and fixed section headers used throughout the alert
+_SEPARATOR = "━" * 20 + "\n"
+_RISK_HEADER = _SEPARATOR + "⚠️ *RISK MANAGEMENT*\n" + _SEPARATOR + "\n"
+_OPTIONS_HEADER = _SEPARATOR + "📞 *OPTIONS STRATEGY*\n" + _SEPARATOR + "\n"
+_SUMMARY_HEADER = _SEPARATOR + "📚 *TRADE SUMMARY*\n" + _SEPARATOR + "\n"
+
+# Emoji shown next to each pyramid action
+_PYRAMID_EMOJI = {
+    "INITIAL": "🆕",
+    "ADD_25%": "📈",
+    "ADD_50%": "🚀",
+    "HOLD": "💎",
+    "EXIT": "🚪"
+}
+
+# (max range %, min volume multiple, label), checked in order
+_BREAKOUT_TYPES = (
+    (1.5, 3.0, "EXPLOSIVE BREAKOUT FROM TIGHT BASE"),
+    (2.0, 2.5, "STRONG BREAKOUT WITH VOLUME"),
+    (3.0, 2.0, "CLEAN BREAKOUT SETUP"),
+)
+
+# (min score, rating), checked in order
+_SCORE_TABLE = (
+    (85, "EXCEPTIONAL 🔥🔥🔥"),
+    (75, "STRONG 🔥🔥"),
+    (65, "GOOD 🔥"),
+)
+
+
+# Alert body up to the Livermore plan; filled via str.format_map
+_ALERT_TEMPLATE = (
+    "🚨 *BREAKOUT ALERT* 🚨\n"
+    "Score: *{signal_strength:.0f}/100* | {score_rating}\n\n"
+    
+    + _SEPARATOR +
+    "📊 *{ticker}* @ ${price:.2f}\n"
+    "⏰ {time}\n"
+    "📍 Timeframe: {interval} | Tier: {tier}\n"
+    + _SEPARATOR + "\n"
+    
+    "🎯 *WHY THIS ALERT?*\n\n"
+    
+    "*{breakout_type}*\n\n"
+    
+    "*1️⃣ ACCUMULATION PHASE (Wyckoff)*\n"
+    "• Tight {range_pct:.1f}% consolidation range\n"
+    "• 20-bar base building (accumulation)\n"
+    "• Price coiled like a spring ⚡\n"
+    "• Smart money accumulating position\n\n"
+    
+    "*2️⃣ VOLUME CONFIRMATION (VPA)*\n"
+    "• Current volume: *{volume_multiple:.1f}x average*\n"
+    "• Volume type: *{volume_type}*\n"
+    "• {vol_explanation}\n"
+    "• Effort vs Result: *{effort_vs_result}*\n"
+    "• Volume trend: {volume_trend}\n\n"
+    
+    "*3️⃣ TREND ALIGNMENT (Murphy)*\n"
+    "{ema_explanation}\n"
+    "• All EMAs stacked bullish 📈\n"
+    "• Price above all moving averages\n"
+    "• Strong uptrend confirmed ✅\n\n"
+    
+    "*4️⃣ PRICE ACTION (Brooks)*\n"
+    "• Bullish breakout candle (close > open)\n"
+    "• Strong close above range high\n"
+    "• Break of structure confirmed\n"
+    "• No weak/indecision bars\n\n"
+    
+    + _RISK_HEADER +
+    
+    "*Entry & Stops:*\n"
+    "• Entry: ${entry_price:.2f}\n"
+    "• Stop Loss: ${atr_stop:.2f}\n"
+    "• Risk: {stop_distance_pct:.1f}% ({atr:.2f} ATR)\n"
+    "• R:R Ratio: *{risk_reward_ratio:.1f}:1*\n\n"
+    
+    "*Profit Targets:*\n"
+    "• Target 1: ${target_1:.2f} (2R) 🎯\n"
+    "• Target 2: ${target_2:.2f} (3R) 🎯🎯\n"
+    "• Target 3: ${target_3:.2f} (5R) 🎯🎯🎯\n\n"
+    
+    "*Position Sizing:*\n"
+    "• Recommended: *{position_size_pct:.1f}%* of portfolio\n"
+    "• (Calculated for 1% account risk)\n\n"
+    
+    + _OPTIONS_HEADER +
+    
+    "*Recommendation:* {strategy}\n"
+    "• Strike: ${strike:.0f}\n"
+    "• Expiry: {expiry_days} days\n"
+    "• Why: {options_reasoning}\n\n"
+    
+    + _SEPARATOR +
+    "{pyramid_emoji} *LIVERMORE PLAN*\n"
+    + _SEPARATOR + "\n"
+    
+    "*Action:* {action}\n"
+    "• {pyramid_reasoning}\n"
+)
+
+# Extra plan shown for a fresh entry (no substitutions)
+_PYRAMID_INITIAL_SECTION = (
+    "\n*Pyramiding Plan:*\n"
+    "• Initial: 100% position now\n"
+    "• Add 25% if +10% profit\n"
+    "• Add 50% if +20% profit\n"
+    "• Exit if -2% (cut losers fast)\n"
+)
+
+# Extra note shown when adding to a winner
+_PYRAMID_ADD_TEMPLATE = (
+    "\n*Current Profit:* +{current_profit_pct:.1f}%\n"
+    "• This is a WINNER - add to it!\n"
+)
+
+_SUMMARY_TEMPLATE = (
+    "\n\n" + _SUMMARY_HEADER +
+    
+    "This is a *{breakout_type_lower}* with:\n"
+    "✅ Wyckoff accumulation base\n"
+    "✅ {volume_multiple:.1f}x volume spike\n"
+    "✅ EMA trend alignment\n"
+    "✅ Strong price action\n"
+    "✅ {risk_reward_ratio:.1f}:1 risk/reward\n\n"
+    
+    "_Strategy: Enter on breakout, stop below base, "
+    "targets at 2R/3R/5R. Add to winners per Livermore._\n\n"
+    
+    "⚡ *Take action or set alerts!* ⚡"
+)
+
 
 def format_detailed_alert(sig: EnhancedSignal) -> str:
     """
@@ -21,134 +157,60 @@ def format_detailed_alert(sig: EnhancedSignal) -> str:
     - Trading plan
     """
     
-    # Volume analysis explanation
-    vol_explanation = _explain_volume(sig.volume_multiple, sig.vpa_analysis.volume_type)
-    
-    # EMA trend explanation
-    ema_explanation = _explain_ema_trend()
-    
     # Breakout type
     breakout_type = _identify_breakout_type(sig.range_pct, sig.volume_multiple)
     
-    # Pyramid emoji
-    pyramid_emoji = {
-        "INITIAL": "🆕",
-        "ADD_25%": "📈",
-        "ADD_50%": "🚀",
-        "HOLD": "💎",
-        "EXIT": "🚪"
-    }.get(sig.pyramid_signal.action, "")
-    
-    # Build comprehensive alert
-    msg = (
-        f"🚨 *BREAKOUT ALERT* 🚨\n"
-        f"Score: *{sig.signal_strength:.0f}/100* | {_score_rating(sig.signal_strength)}\n\n"
-        
-        f"━━━━━━━━━━━━━━━━━━━━\n"
-        f"📊 *{sig.ticker}* @ ${sig.price:.2f}\n"
-        f"⏰ {sig.time}\n"
-        f"📍 Timeframe: {sig.interval} | Tier: {sig.tier}\n"
-        f"━━━━━━━━━━━━━━━━━━━━\n\n"
-        
-        f"🎯 *WHY THIS ALERT?*\n\n"
-        
-        f"*{breakout_type}*\n\n"
-        
-        f"*1️⃣ ACCUMULATION PHASE (Wyckoff)*\n"
-        f"• Tight {sig.range_pct:.1f}% consolidation range\n"
-        f"• 20-bar base building (accumulation)\n"
-        f"• Price coiled like a spring ⚡\n"
-        f"• Smart money accumulating position\n\n"
-        
-        f"*2️⃣ VOLUME CONFIRMATION (VPA)*\n"
-        f"• Current volume: *{sig.volume_multiple:.1f}x average*\n"
-        f"• Volume type: *{sig.vpa_analysis.volume_type}*\n"
-        f"• {vol_explanation}\n"
-        f"• Effort vs Result: *{sig.vpa_analysis.effort_vs_result}*\n"
-        f"• Volume trend: {sig.vpa_analysis.volume_trend}\n\n"
-        
-        f"*3️⃣ TREND ALIGNMENT (Murphy)*\n"
-        f"{ema_explanation}\n"
-        f"• All EMAs stacked bullish 📈\n"
-        f"• Price above all moving averages\n"
-        f"• Strong uptrend confirmed ✅\n\n"
-        
-        f"*4️⃣ PRICE ACTION (Brooks)*\n"
-        f"• Bullish breakout candle (close > open)\n"
-        f"• Strong close above range high\n"
-        f"• Break of structure confirmed\n"
-        f"• No weak/indecision bars\n\n"
-        
-        f"━━━━━━━━━━━━━━━━━━━━\n"
-        f"⚠️ *RISK MANAGEMENT*\n"
-        f"━━━━━━━━━━━━━━━━━━━━\n\n"
-        
-        f"*Entry & Stops:*\n"
-        f"• Entry: ${sig.risk_metrics.entry_price:.2f}\n"
-        f"• Stop Loss: ${sig.risk_metrics.atr_stop:.2f}\n"
-        f"• Risk: {sig.risk_metrics.stop_distance_pct:.1f}% ({sig.atr_data.atr:.2f} ATR)\n"
-        f"• R:R Ratio: *{sig.risk_metrics.risk_reward_ratio:.1f}:1*\n\n"
-        
-        f"*Profit Targets:*\n"
-        f"• Target 1: ${sig.risk_metrics.target_1:.2f} (2R) 🎯\n"
-        f"• Target 2: ${sig.risk_metrics.target_2:.2f} (3R) 🎯🎯\n"
-        f"• Target 3: ${sig.risk_metrics.target_3:.2f} (5R) 🎯🎯🎯\n\n"
-        
-        f"*Position Sizing:*\n"
-        f"• Recommended: *{sig.risk_metrics.position_size_pct:.1f}%* of portfolio\n"
-        f"• (Calculated for 1% account risk)\n\n"
-        
-        f"━━━━━━━━━━━━━━━━━━━━\n"
-        f"📞 *OPTIONS STRATEGY*\n"
-        f"━━━━━━━━━━━━━━━━━━━━\n\n"
-        
-        f"*Recommendation:* {sig.options_rec.strategy}\n"
-        f"• Strike: ${sig.options_rec.strike:.0f}\n"
-        f"• Expiry: {sig.options_rec.expiry_days} days\n"
-        f"• Why: {sig.options_rec.reasoning}\n\n"
-        
-        f"━━━━━━━━━━━━━━━━━━━━\n"
-        f"{pyramid_emoji} *LIVERMORE PLAN*\n"
-        f"━━━━━━━━━━━━━━━━━━━━\n\n"
-        
-        f"*Action:* {sig.pyramid_signal.action}\n"
-        f"• {sig.pyramid_signal.reasoning}\n"
-    )
+    vpa = sig.vpa_analysis
+    risk = sig.risk_metrics
+    pyramid = sig.pyramid_signal
+    
+    fields = {
+        "signal_strength": sig.signal_strength,
+        "score_rating": _score_rating(sig.signal_strength),
+        "ticker": sig.ticker,
+        "price": sig.price,
+        "time": sig.time,
+        "interval": sig.interval,
+        "tier": sig.tier,
+        "breakout_type": breakout_type,
+        "breakout_type_lower": breakout_type.lower(),
+        "range_pct": sig.range_pct,
+        "volume_multiple": sig.volume_multiple,
+        "volume_type": vpa.volume_type,
+        "vol_explanation": _explain_volume(sig.volume_multiple, vpa.volume_type),
+        "effort_vs_result": vpa.effort_vs_result,
+        "volume_trend": vpa.volume_trend,
+        "ema_explanation": _explain_ema_trend(),
+        "entry_price": risk.entry_price,
+        "atr_stop": risk.atr_stop,
+        "stop_distance_pct": risk.stop_distance_pct,
+        "atr": sig.atr_data.atr,
+        "risk_reward_ratio": risk.risk_reward_ratio,
+        "target_1": risk.target_1,
+        "target_2": risk.target_2,
+        "target_3": risk.target_3,
+        "position_size_pct": risk.position_size_pct,
+        "strategy": sig.options_rec.strategy,
+        "strike": sig.options_rec.strike,
+        "expiry_days": sig.options_rec.expiry_days,
+        "options_reasoning": sig.options_rec.reasoning,
+        "pyramid_emoji": _PYRAMID_EMOJI.get(pyramid.action, ""),
+        "action": pyramid.action,
+        "pyramid_reasoning": pyramid.reasoning,
+        "current_profit_pct": pyramid.current_profit_pct,
+    }
+    
+    parts = [_ALERT_TEMPLATE.format_map(fields)]
     
     # Add pyramid plan if initial entry
-    if sig.pyramid_signal.action == "INITIAL":
-        msg += (
-            f"\n*Pyramiding Plan:*\n"
-            f"• Initial: 100% position now\n"
-            f"• Add 25% if +10% profit\n"
-            f"• Add 50% if +20% profit\n"
-            f"• Exit if -2% (cut losers fast)\n"
-        )
-    elif sig.pyramid_signal.action in ["ADD_25%", "ADD_50%"]:
-        msg += (
-            f"\n*Current Profit:* +{sig.pyramid_signal.current_profit_pct:.1f}%\n"
-            f"• This is a WINNER - add to it!\n"
-        )
+    if pyramid.action == "INITIAL":
+        parts.append(_PYRAMID_INITIAL_SECTION)
+    elif pyramid.action in ["ADD_25%", "ADD_50%"]:
+        parts.append(_PYRAMID_ADD_TEMPLATE.format_map(fields))
     
-    msg += (
-        f"\n\n━━━━━━━━━━━━━━━━━━━━\n"
-        f"📚 *TRADE SUMMARY*\n"
-        f"━━━━━━━━━━━━━━━━━━━━\n\n"
-        
-        f"This is a *{breakout_type.lower()}* with:\n"
-        f"✅ Wyckoff accumulation base\n"
-        f"✅ {sig.volume_multiple:.1f}x volume spike\n"
-        f"✅ EMA trend alignment\n"
-        f"✅ Strong price action\n"
-        f"✅ {sig.risk_metrics.risk_reward_ratio:.1f}:1 risk/reward\n\n"
-        
-        f"_Strategy: Enter on breakout, stop below base, "
-        f"targets at 2R/3R/5R. Add to winners per Livermore._\n\n"
-        
-        f"⚡ *Take action or set alerts!* ⚡"
-    )
+    parts.append(_SUMMARY_TEMPLATE.format_map(fields))
     
-    return msg
+    return "".join(parts)
 
 
 def _explain_volume(vol_multiple: float, vol_type: str) -> str:
@@ -184,26 +246,35 @@ def _explain_ema_trend() -> str:
 
 def _identify_breakout_type(range_pct: float, vol_multiple: float) -> str:
     """Identify type of breakout"""
-    if range_pct <= 1.5 and vol_multiple >= 3.0:
-        return "EXPLOSIVE BREAKOUT FROM TIGHT BASE"
-    elif range_pct <= 2.0 and vol_multiple >= 2.5:
-        return "STRONG BREAKOUT WITH VOLUME"
-    elif range_pct <= 3.0 and vol_multiple >= 2.0:
-        return "CLEAN BREAKOUT SETUP"
-    else:
-        return "BREAKOUT PATTERN"
+    # Thresholds have one decimal, so rounding range up and volume down to
+    # tenths keeps every comparison exact while making results cacheable
+    return _breakout_type_for(
+        math.ceil(range_pct * 10) / 10, math.floor(vol_multiple * 10) / 10
+    )
+
+
+@lru_cache(maxsize=256)
+def _breakout_type_for(range_pct: float, vol_multiple: float) -> str:
+    """Breakout type for quantized inputs"""
+    for max_range, min_vol, label in _BREAKOUT_TYPES:
+        if range_pct <= max_range and vol_multiple >= min_vol:
+            return label
+    return "BREAKOUT PATTERN"
 
 
 def _score_rating(score: float) -> str:
     """Convert score to rating"""
-    if score >= 85:
-        return "EXCEPTIONAL 🔥🔥🔥"
-    elif score >= 75:
-        return "STRONG 🔥🔥"
-    elif score >= 65:
-        return "GOOD 🔥"
-    else:
-        return "MARGINAL"
+    # Rating bands start on multiples of 5
+    return _rating_for(int(score // 5) * 5)
+
+
+@lru_cache(maxsize=32)
+def _rating_for(score: int) -> str:
+    """Rating for a score floored to a multiple of 5"""
+    for threshold, rating in _SCORE_TABLE:
+        if score >= threshold:
+            return rating
+    return "MARGINAL"
 
 
 # Example usage
@@ -10,101 +10,253 @@ Strategies to stay within Twelve Data's 800 calls/day limit:
 """
 
 import os
-import json
+import sys
+import pickle
+import sqlite3
 import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import atexit
+import logging
+import queue
+import threading
+import statistics
+from collections import deque, defaultdict
+from datetime import datetime, timedelta, date
+from typing import Iterable, List, Dict, Optional, Tuple, Deque
+import orjson
 import requests
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
 
 
-@dataclass
+# API/cache activity log. Records go through a queue to a background
+# listener so per-symbol messages never block the scan on stdout.
+log = logging.getLogger("api")
+log.setLevel(logging.INFO)
+log.propagate = False
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+log.addHandler(QueueHandler(_log_queue))
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+
+# Requests that never got a usable answer out of the provider (timed out,
+# connection dropped, or a retrying session gave up), so they shouldn't
+# count against the quota
+_UNBILLED_ERRORS = (
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.RetryError,
+)
+
+
+# Adaptive TTLs never drop below this (nor above the configured TTL)
+_MIN_ADAPTIVE_TTL = 15.0
+
+
+@dataclass(slots=True)
 class CachedData:
     """Cached candle data with metadata"""
     symbol: str
     interval: str
     data: List[Dict]
-    timestamp: float
-    ttl_seconds: int
-    
-    def is_expired(self) -> bool:
-        """Check if cache entry has expired"""
-        return time.time() - self.timestamp > self.ttl_seconds
+    expires_at: float  # epoch seconds
 
 
 class APICache:
-    """Cache for API responses with TTL"""
+    """Cache for API responses with TTL, persisted to SQLite"""
     
-    def __init__(self, cache_file: str = "api_cache.json"):
+    def __init__(self, cache_file: str = "api_cache.sqlite", stale_grace: float = 0.0):
         self.cache_file = cache_file
-        self.cache: Dict[str, CachedData] = self._load_cache()
+        # Expired entries stay readable via get_stale() for this many seconds
+        self.stale_grace = stale_grace
+        self._db_lock = threading.Lock()
+        self._db = self._open_db()
+        self.cache: Dict[Tuple[str, str], CachedData] = self._load_cache()
+        self._last_flush = time.time()
+        self._last_sweep = time.time()
+        self._dirty = False
+        
+        # Entries set since the last flush; only these are written out
+        self._pending: Dict[Tuple[str, str], CachedData] = {}
+        
+        # Recent read times per key, used to fit TTLs to the scan cadence
+        self.access_log: Dict[Tuple[str, str], Deque[float]] = defaultdict(
+            lambda: deque(maxlen=32)
+        )
+        
+        # Cache lives in memory during a scan; persist on shutdown
+        atexit.register(self._save_cache)
     
-    def _load_cache(self) -> Dict[str, CachedData]:
-        """Load cache from file"""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r') as f:
-                    data = json.load(f)
-                    return {
-                        k: CachedData(**v) for k, v in data.items()
-                    }
-            except Exception as e:
-                print(f"[Cache] Error loading cache: {e}")
-                return {}
-        return {}
+    def _open_db(self) -> sqlite3.Connection:
+        """Open the cache database (one row per symbol/interval)"""
+        db = sqlite3.connect(self.cache_file, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS candles ("
+            " symbol TEXT NOT NULL,"
+            " interval TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " data BLOB NOT NULL,"
+            " PRIMARY KEY (symbol, interval))"
+        )
+        db.commit()
+        return db
+    
+    def _load_cache(self) -> Dict[Tuple[str, str], CachedData]:
+        """Load unexpired entries from the database"""
+        try:
+            with self._db_lock:
+                rows = self._db.execute(
+                    "SELECT symbol, interval, expires_at, data FROM candles"
+                    " WHERE expires_at > ?", (time.time(),)
+                ).fetchall()
+            cache = {}
+            for symbol, interval, expires_at, blob in rows:
+                # Share one string object per symbol/interval across the cache
+                symbol, interval = sys.intern(symbol), sys.intern(interval)
+                cache[(symbol, interval)] = CachedData(
+                    symbol=symbol,
+                    interval=interval,
+                    data=pickle.loads(blob),
+                    expires_at=expires_at
+                )
+            return cache
+        except Exception as e:
+            log.error("[Cache] Error loading cache: %s", e)
+            return {}
     
     def _save_cache(self):
-        """Save cache to file"""
+        """Write entries set since the last flush and drop expired rows"""
+        pending, self._pending = self._pending, {}
         try:
-            data = {k: asdict(v) for k, v in self.cache.items()}
-            with open(self.cache_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            now = time.time()
+            rows = [
+                (e.symbol, e.interval, e.expires_at, pickle.dumps(e.data, protocol=5))
+                for e in pending.values() if e.expires_at > now
+            ]
+            with self._db_lock, self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?)", rows
+                )
+                self._db.execute("DELETE FROM candles WHERE expires_at <= ?", (now,))
+            self._dirty = False
+            self._last_flush = time.time()
         except Exception as e:
-            print(f"[Cache] Error saving cache: {e}")
+            # Keep the unsaved entries for the next flush (newer sets win)
+            for key, entry in pending.items():
+                self._pending.setdefault(key, entry)
+            log.error("[Cache] Error saving cache: %s", e)
     
-    def get_cache_key(self, symbol: str, interval: str) -> str:
-        """Generate cache key"""
-        return f"{symbol}_{interval}"
+    def clear(self):
+        """Remove every entry from memory and disk"""
+        self.cache.clear()
+        self._pending.clear()
+        try:
+            with self._db_lock, self._db:
+                self._db.execute("DELETE FROM candles")
+        except Exception as e:
+            log.error("[Cache] Error clearing cache: %s", e)
+    
+    def flush_if_stale(self, interval_seconds: int = 60):
+        """Save cache to file if it changed and hasn't been saved recently"""
+        if self._dirty and time.time() - self._last_flush >= interval_seconds:
+            self._save_cache()
+    
+    @staticmethod
+    def _key(symbol: str, interval: str) -> Tuple[str, str]:
+        """Normalized cache key, so "aapl " and "AAPL" share one entry"""
+        return sys.intern(symbol.strip().upper()), sys.intern(interval.strip())
     
     def get(self, symbol: str, interval: str) -> Optional[List[Dict]]:
-        """Get cached data if not expired"""
-        key = self.get_cache_key(symbol, interval)
-        if key in self.cache:
-            cached = self.cache[key]
-            if not cached.is_expired():
-                return cached.data
-            else:
-                # Remove expired entry
-                del self.cache[key]
-                self._save_cache()
+        """Get cached data if not expired (memory only; never reads disk)"""
+        key = self._key(symbol, interval)
+        now = time.time()
+        self.access_log[key].append(now)
+        cached = self.cache.get(key)
+        if cached is not None and cached.expires_at > now:
+            return cached.data
+        # Expired entries are left for sweep_expired()
+        return None
+    
+    def get_stale(self, symbol: str, interval: str) -> Optional[CachedData]:
+        """Get an entry that expired less than stale_grace seconds ago"""
+        cached = self.cache.get(self._key(symbol, interval))
+        if cached is not None and cached.expires_at + self.stale_grace > time.time():
+            return cached
         return None
     
+    def _adaptive_ttl(self, key: Tuple[str, str], ttl_seconds: float) -> float:
+        """
+        Fit TTL to how often this key is actually read, never exceeding
+        ttl_seconds. Expires half way between scans instead of right on one,
+        so scheduler jitter can't turn the last in-budget read into a miss.
+        """
+        accesses = self.access_log.get(key)
+        if not accesses or len(accesses) < 3:
+            return ttl_seconds
+        
+        gap = statistics.median(b - a for a, b in zip(accesses, list(accesses)[1:]))
+        if gap <= 0 or gap > ttl_seconds:
+            return ttl_seconds
+        
+        # ttl_seconds is the freshness budget: the half-way point after the
+        # last read that fits, else the one before it, never past the budget
+        reads = int(ttl_seconds // gap)
+        ttl = reads * gap + gap * 0.5
+        if ttl > ttl_seconds:
+            ttl = (reads - 0.5) * gap
+        return min(ttl_seconds, max(ttl, _MIN_ADAPTIVE_TTL))
+    
     def set(self, symbol: str, interval: str, data: List[Dict], ttl_seconds: int):
-        """Cache data with TTL"""
-        key = self.get_cache_key(symbol, interval)
-        self.cache[key] = CachedData(
-            symbol=symbol,
-            interval=interval,
+        """Cache data with TTL (adjusted to the key's read cadence)"""
+        key = self._key(symbol, interval)
+        ttl = self._adaptive_ttl(key, ttl_seconds)
+        entry = CachedData(
+            symbol=key[0],
+            interval=key[1],
             data=data,
-            timestamp=time.time(),
-            ttl_seconds=ttl_seconds
+            expires_at=time.time() + ttl
         )
-        self._save_cache()
+        self.cache[key] = entry
+        self._pending[key] = entry
+        self._dirty = True
+    
+    def sweep_expired(self, interval_seconds: int = 60):
+        """Drop expired entries from memory, at most once per interval"""
+        now = time.time()
+        if now - self._last_sweep < interval_seconds:
+            return
+        self._last_sweep = now
+        cutoff = now - self.stale_grace
+        expired_keys = [
+            k for k, v in list(self.cache.items()) if v.expires_at <= cutoff
+        ]
+        for key in expired_keys:
+            self.cache.pop(key, None)
     
     def clear_expired(self):
         """Remove all expired entries"""
+        cutoff = time.time() - self.stale_grace
         expired_keys = [
-            k for k, v in self.cache.items() if v.is_expired()
+            k for k, v in self.cache.items() if v.expires_at <= cutoff
         ]
         for key in expired_keys:
             del self.cache[key]
         if expired_keys:
             self._save_cache()
-            print(f"[Cache] Cleared {len(expired_keys)} expired entries")
+            log.info("[Cache] Cleared %d expired entries", len(expired_keys))
 
 
 class APIRateLimiter:
-    """Rate limiter to prevent hitting API limits"""
+    """
+    Rate limiter to prevent hitting API limits.
+    Per-minute throttle is a token bucket; the daily cap is a calendar-day
+    counter because that's how providers meter their quotas.
+    """
     
     def __init__(self, max_calls_per_day: int = 800, 
                  max_calls_per_minute: int = 8,
@@ -113,14 +265,27 @@ class APIRateLimiter:
         self.max_calls_per_minute = max_calls_per_minute
         self.usage_file = usage_file
         self.usage = self._load_usage()
-        self.minute_calls = []
+        # Token bucket: bursts up to max_calls_per_minute, refilled continuously
+        self._tokens = float(max_calls_per_minute)
+        self._refill_rate = max_calls_per_minute / 60.0
+        self._last_refill = time.time()
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_persist = 0
+        
+        # Day boundary cache; 0 forces a full check on first use
+        self._today_str = ""
+        self._today_epoch_end = 0.0
+        
+        # Usage is persisted in batches; make sure the final count is saved
+        atexit.register(self.flush)
     
     def _load_usage(self) -> Dict:
         """Load usage tracking"""
         if os.path.exists(self.usage_file):
             try:
-                with open(self.usage_file, 'r') as f:
-                    return json.load(f)
+                with open(self.usage_file, 'rb') as f:
+                    return orjson.loads(f.read())
             except:
                 return self._init_usage()
         return self._init_usage()
@@ -135,47 +300,114 @@ class APIRateLimiter:
     
     def _save_usage(self):
         """Save usage tracking"""
-        with open(self.usage_file, 'w') as f:
-            json.dump(self.usage, f, indent=2)
+        with open(self.usage_file, 'wb') as f:
+            f.write(orjson.dumps(self.usage))
+        self._dirty = False
+        self._last_persist = time.time()
+    
+    def _persist_if_due(self, min_interval: float = 5.0):
+        """Save usage tracking at most once per min_interval seconds"""
+        self._dirty = True
+        if time.time() - self._last_persist > min_interval:
+            self._save_usage()
+    
+    def flush(self):
+        """Save usage tracking if there are unsaved changes"""
+        if self._dirty:
+            self._save_usage()
+    
+    def _update_day_boundary(self):
+        """Cache today's date string and the epoch time of next midnight"""
+        today = date.today()
+        self._today_str = today.strftime("%Y-%m-%d")
+        midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+        self._today_epoch_end = midnight.timestamp()
     
     def _reset_if_new_day(self):
         """Reset counter if it's a new day"""
-        today = datetime.now().strftime("%Y-%m-%d")
+        if time.time() < self._today_epoch_end:
+            return
+        self._update_day_boundary()
+        today = self._today_str
         if self.usage["date"] != today:
             self.usage = self._init_usage()
-            self._save_usage()
-            print(f"[RateLimit] Reset daily counter for {today}")
+            self._persist_if_due()
+            log.info("[RateLimit] Reset daily counter for %s", today)
+    
+    def _refill(self):
+        """Add the tokens earned since the last refill"""
+        now = time.time()
+        self._tokens = min(
+            float(self.max_calls_per_minute),
+            self._tokens + (now - self._last_refill) * self._refill_rate
+        )
+        self._last_refill = now
     
     def can_make_call(self) -> bool:
         """Check if we can make an API call"""
-        self._reset_if_new_day()
-        
-        # Check daily limit
-        if self.usage["calls"] >= self.max_calls_per_day:
-            return False
-        
-        # Check per-minute limit
-        now = time.time()
-        self.minute_calls = [t for t in self.minute_calls if now - t < 60]
-        if len(self.minute_calls) >= self.max_calls_per_minute:
-            return False
-        
-        return True
+        with self._lock:
+            self._reset_if_new_day()
+            
+            # Check daily limit
+            if self.usage["calls"] >= self.max_calls_per_day:
+                return False
+            
+            # Check per-minute bucket
+            self._refill()
+            return self._tokens >= 1
+    
+    def try_acquire(self) -> bool:
+        """Check and record a call in one step (safe across threads)"""
+        return self.reserve(1) == 1
+    
+    def reserve(self, n: int) -> int:
+        """
+        Record up to n calls at once, within both the daily and per-minute
+        budgets. Returns how many were granted.
+        """
+        with self._lock:
+            self._reset_if_new_day()
+            self._refill()
+            granted = max(0, min(
+                n,
+                self.max_calls_per_day - self.usage["calls"],
+                int(self._tokens),
+            ))
+            if granted:
+                self.usage["calls"] += granted
+                self._tokens -= granted
+                self._persist_if_due()
+            return granted
+    
+    def release(self, n: int = 1):
+        """Give back reserved calls that never reached the provider"""
+        with self._lock:
+            self.usage["calls"] = max(0, self.usage["calls"] - n)
+            self._persist_if_due()
     
-    def wait_if_needed(self):
-        """Wait if rate limit would be exceeded"""
+    def wait_if_needed(self, max_daily_wait: Optional[float] = None):
+        """
+        Wait if rate limit would be exceeded.
+        Sleeps exactly until a slot frees up; max_daily_wait caps each sleep
+        on the daily limit so callers can stay responsive.
+        """
         while not self.can_make_call():
             # Check daily limit
             if self.usage["calls"] >= self.max_calls_per_day:
                 remaining = self._time_until_reset()
-                print(f"[RateLimit] Daily limit reached ({self.usage['calls']}/{self.max_calls_per_day})")
-                print(f"[RateLimit] Waiting {remaining} until reset...")
-                time.sleep(min(300, remaining))  # Wait max 5 min at a time
+                log.warning("[RateLimit] Daily limit reached (%d/%d)", self.usage["calls"], self.max_calls_per_day)
+                log.warning("[RateLimit] Waiting %s until reset...", remaining)
+                if max_daily_wait is not None:
+                    remaining = min(max_daily_wait, remaining)
+                time.sleep(max(1, remaining))
                 self._reset_if_new_day()
             else:
-                # Per-minute limit
-                print(f"[RateLimit] Per-minute limit reached, waiting 10s...")
-                time.sleep(10)
+                # Per-minute limit: sleep until the bucket holds a whole token
+                with self._lock:
+                    self._refill()
+                    sleep_for = max(0.01, (1 - self._tokens) / self._refill_rate + 0.01)
+                log.info("[RateLimit] Per-minute limit reached, waiting %.1fs...", sleep_for)
+                time.sleep(sleep_for)
     
     def _time_until_reset(self) -> int:
         """Seconds until daily reset (midnight)"""
@@ -186,10 +418,12 @@ class APIRateLimiter:
     
     def record_call(self):
         """Record an API call"""
-        self._reset_if_new_day()
-        self.usage["calls"] += 1
-        self.minute_calls.append(time.time())
-        self._save_usage()
+        with self._lock:
+            self._reset_if_new_day()
+            self.usage["calls"] += 1
+            self._refill()
+            self._tokens -= 1
+            self._persist_if_due()
     
     def get_remaining_calls(self) -> int:
         """Get remaining calls for today"""
@@ -216,6 +450,9 @@ class OptimizedAPIClient:
         self.cache = APICache()
         self.rate_limiter = APIRateLimiter()
         
+        # Reuse one connection (keep-alive) for all Twelve Data requests
+        self.session = requests.Session()
+        
         # Default cache TTL by interval
         self.cache_ttl = cache_ttl_minutes or {
             "1min": 1,      # 1 minute cache for 1min data
@@ -234,17 +471,14 @@ class OptimizedAPIClient:
         # Try cache first
         cached = self.cache.get(symbol, interval)
         if cached is not None:
-            print(f"[Cache HIT] {symbol} {interval}")
+            log.info("[Cache HIT] %s %s", symbol, interval)
             return cached
         
-        # Check if we can make API call
-        if not self.rate_limiter.can_make_call():
-            print(f"[RateLimit] Cannot fetch {symbol} - limit reached")
+        # Reserve an API call (atomic, so concurrent fetches can't overshoot)
+        if not self.rate_limiter.try_acquire():
+            log.warning("[RateLimit] Cannot fetch %s - limit reached", symbol)
             return None
         
-        # Wait if needed (throttle)
-        self.rate_limiter.wait_if_needed()
-        
         # Make API call
         try:
             url = "https://api.twelvedata.com/time_series"
@@ -256,14 +490,11 @@ class OptimizedAPIClient:
                 "order": "ASC",
             }
             
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
-            
-            # Record the call
-            self.rate_limiter.record_call()
+            resp = self.session.get(url, params=params, timeout=10)
+            data = orjson.loads(resp.content)
             
             if isinstance(data, dict) and data.get("status") == "error":
-                print(f"[API Error] {symbol}: {data.get('message', 'Unknown')}")
+                log.error("[API Error] %s: %s", symbol, data.get("message", "Unknown"))
                 return None
             
             values = data.get("values", [])
@@ -273,58 +504,143 @@ class OptimizedAPIClient:
             # Cache the result
             ttl_minutes = self.cache_ttl.get(interval, 5)
             self.cache.set(symbol, interval, values, ttl_minutes * 60)
+            self.cache.sweep_expired()
+            self.cache.flush_if_stale()
             
-            print(f"[API CALL] {symbol} {interval} - {self.rate_limiter.get_remaining_calls()} calls remaining")
+            log.info("[API CALL] %s %s - %d calls remaining", symbol, interval, self.rate_limiter.get_remaining_calls())
             
             return values
             
         except Exception as e:
-            print(f"[API Error] {symbol}: {e}")
+            log.error("[API Error] %s: %s", symbol, e)
             return None
     
+    def fetch_candles_batch(self, symbols: List[str], interval: str,
+                            outputsize: int = 120) -> Dict[str, List[Dict]]:
+        """
+        Fetch candles for many symbols using Twelve Data's multi-symbol
+        time_series request (comma-separated symbols, one HTTP round-trip).
+        Returns dict of symbol -> candle dicts; failed symbols are omitted.
+        """
+        results: Dict[str, List[Dict]] = {}
+        to_fetch: List[str] = []
+        
+        # Serve what we can from cache
+        for symbol in symbols:
+            cached = self.cache.get(symbol, interval)
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                to_fetch.append(symbol)
+        
+        if not to_fetch:
+            return results
+        
+        # Each symbol costs one API credit, so a batch can't exceed the
+        # per-minute budget (Twelve Data caps batches at 120 symbols)
+        batch_size = max(1, min(120, self.rate_limiter.max_calls_per_minute))
+        ttl_minutes = self.cache_ttl.get(interval, 5)
+        url = "https://api.twelvedata.com/time_series"
+        
+        i = 0
+        while i < len(to_fetch):
+            if self.rate_limiter.get_remaining_calls() == 0:
+                log.warning("[RateLimit] Cannot fetch %d symbols - limit reached", len(to_fetch) - i)
+                break
+            
+            # Wait if needed (throttle), then take as many credits as are free
+            self.rate_limiter.wait_if_needed()
+            granted = self.rate_limiter.reserve(min(batch_size, len(to_fetch) - i))
+            if not granted:
+                continue
+            chunk = to_fetch[i:i + granted]
+            i += granted
+            
+            try:
+                params = {
+                    "symbol": ",".join(chunk),
+                    "interval": interval,
+                    "outputsize": outputsize,
+                    "apikey": self.api_key,
+                    "order": "ASC",
+                }
+                
+                resp = self.session.get(url, params=params, timeout=30)
+                data = orjson.loads(resp.content)
+                
+                if isinstance(data, dict) and data.get("status") == "error":
+                    # Rejected outright (bad key, throttled): no data, no credits
+                    self.rate_limiter.release(len(chunk))
+                    log.error("[API Error] batch %s..: %s", chunk[0], data.get("message", "Unknown"))
+                    continue
+                
+                # A single-symbol request isn't keyed by symbol
+                if len(chunk) == 1:
+                    data = {chunk[0]: data}
+                
+                for symbol in chunk:
+                    entry = data.get(symbol)
+                    if not isinstance(entry, dict) or entry.get("status") == "error":
+                        continue
+                    values = entry.get("values", [])
+                    if not values:
+                        continue
+                    self.cache.set(symbol, interval, values, ttl_minutes * 60)
+                    results[symbol] = values
+                
+                log.info("[API BATCH] %d symbols %s - %d calls remaining", len(chunk), interval, self.rate_limiter.get_remaining_calls())
+                
+            except _UNBILLED_ERRORS as e:
+                self.rate_limiter.release(len(chunk))
+                log.error("[API Error] batch %s..: %s", chunk[0], e)
+            except Exception as e:
+                log.error("[API Error] batch %s..: %s", chunk[0], e)
+        
+        self.cache.sweep_expired()
+        self.cache.flush_if_stale()
+        return results
+    
     def get_stats(self) -> Dict:
         """Get API usage statistics"""
         return self.rate_limiter.get_usage_stats()
     
     def clear_cache(self):
         """Clear all cached data"""
-        self.cache.cache = {}
-        self.cache._save_cache()
-        print("[Cache] Cleared all cache")
+        self.cache.clear()
+        log.info("[Cache] Cleared all cache")
+
 
+# Priority tiers for scanning order (higher = more important, default 50)
+_PRIORITY_MAP = {
+    # Mega cap tech
+    "AAPL": 100, "MSFT": 100, "GOOGL": 100, "AMZN": 100, "NVDA": 100,
+    "META": 100, "TSLA": 100,
+    
+    # Major indices
+    "SPY": 95, "QQQ": 95, "IWM": 90, "DIA": 90,
+    
+    # High volume tech
+    "AMD": 85, "INTC": 80, "AVGO": 80, "ORCL": 75,
+    
+    # Popular stocks
+    "NFLX": 80, "COIN": 75, "PLTR": 75, "CRWD": 70,
+}
 
-def prioritize_symbols(symbols: List[str], max_symbols: int = None) -> List[str]:
+
+def prioritize_symbols(symbols: Iterable[str], max_symbols: int = None) -> List[str]:
     """
     Prioritize symbols for scanning based on liquidity/importance
     Returns prioritized list, optionally limited to max_symbols
     """
-    # Define priority tiers (higher = more important)
-    priority_map = {
-        # Mega cap tech
-        "AAPL": 100, "MSFT": 100, "GOOGL": 100, "AMZN": 100, "NVDA": 100,
-        "META": 100, "TSLA": 100,
-        
-        # Major indices
-        "SPY": 95, "QQQ": 95, "IWM": 90, "DIA": 90,
-        
-        # High volume tech
-        "AMD": 85, "INTC": 80, "AVGO": 80, "ORCL": 75,
-        
-        # Popular stocks
-        "NFLX": 80, "COIN": 75, "PLTR": 75, "CRWD": 70,
-    }
-    
-    # Sort by priority (high to low), then alphabetically
-    sorted_symbols = sorted(
-        symbols,
-        key=lambda s: (priority_map.get(s, 50), s),
-        reverse=True
-    )
+    # Sort by priority (high to low), then alphabetically.
+    # Keys are computed once per symbol rather than inside the comparator.
+    decorated = [(-_PRIORITY_MAP.get(s, 50), sys.intern(s)) for s in symbols]
+    decorated.sort()
     
     if max_symbols:
-        return sorted_symbols[:max_symbols]
+        decorated = decorated[:max_symbols]
     
-    return sorted_symbols
+    return [s for _, s in decorated]
 
 
 # Example usage
@@ -16,7 +16,7 @@ What this does:
 - Sends alerts via Telegram when a breakout is detected.
 
 Setup:
-1. pip install requests schedule python-dotenv
+1. pip install -r requirements.txt
 2. Create a .env file with:
    TWELVE_DATA_API_KEY=your_twelvedata_api_key_here
    TELEGRAM_BOT_TOKEN=your_telegram_bot_token_here
@@ -27,8 +27,10 @@ Setup:
 import os
 import time
 from dataclasses import dataclass
-from typing import List, Optional, Dict
+from functools import lru_cache
+from typing import Collection, List, Optional, Dict, Tuple
 
+import numpy as np
 import requests
 import schedule
 from dotenv import load_dotenv
@@ -36,7 +38,8 @@ from stock_universe import ALL_STOCKS_1MIN, ALL_STOCKS_5MIN, ALL_STOCKS_15MIN
 from enhanced_signals import (
     PositionTracker, calculate_atr, calculate_risk_metrics,
     analyze_vpa_advanced, generate_options_recommendation,
-    generate_pyramid_signal, calculate_signal_strength, EnhancedSignal
+    generate_pyramid_signal, calculate_signal_strength, EnhancedSignal,
+    CandleBatch
 )
 from dual_api_client import TripleAPIClient
 from alert_formatter import format_detailed_alert
@@ -57,8 +60,14 @@ if not FMP_API_KEY and not TWELVE_DATA_API_KEY:
 
 USE_TELEGRAM = bool(TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID)
 
+# One keep-alive connection to api.telegram.org for all alerts in a scan
+_TG_SESSION = requests.Session()
+_TG_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 
 # ------------------- Tier configuration (comprehensive US market) -------------------
+# A tier may add "breakout": {...} to override detect_breakout's thresholds
+# (e.g. min_avg_volume, vol_multiplier) for its symbols.
 
 TIERS: Dict[str, Dict] = {
     "fast_1m": {
@@ -79,17 +88,12 @@ TIERS: Dict[str, Dict] = {
 }
 
 
-# ------------------- Data models -------------------
+# Concurrent symbol fetches per tier scan (network-bound; rate limiters
+# still cap actual API usage). Raise for wider fan-out on the free fallbacks.
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "16"))
 
-@dataclass
-class Candle:
-    time: str
-    open: float
-    high: float
-    low: float
-    close: float
-    volume: float
 
+# ------------------- Data models -------------------
 
 @dataclass
 class Signal:
@@ -106,60 +110,103 @@ position_tracker = None
 api_client = None
 
 
-# ------------------- Twelve Data helper -------------------
+# ------------------- Strategy logic -------------------
 
-def fetch_candles(symbol: str, interval: str, outputsize: int = 120) -> List[Candle]:
+@lru_cache(maxsize=None)
+def _ema_weights(length: int) -> np.ndarray:
     """
-    Fetch OHLCV candles using optimized API client with caching.
-    Returns list of Candle sorted oldest→newest.
+    Weights that unroll the EMA recurrence over the last `length` bars
+    (seeded with the first bar) into a single dot product. With fewer than
+    `length` bars the strategy uses the last close instead.
     """
-    global api_client
-    
-    # Use optimized client
-    values = api_client.fetch_candles(symbol, interval, outputsize)
-    
-    if not values:
-        return []
-    
-    candles: List[Candle] = []
-    for v in values:
-        try:
-            candles.append(
-                Candle(
-                    time=v["datetime"],
-                    open=float(v["open"]),
-                    high=float(v["high"]),
-                    low=float(v["low"]),
-                    close=float(v["close"]),
-                    volume=float(v.get("volume", 0.0)),
-                )
-            )
-        except Exception:
-            # Skip malformed row
-            continue
-
-    return candles
-
+    k = 2 / (length + 1)
+    weights = k * (1 - k) ** np.arange(length - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - k) ** (length - 1)
+    return weights
 
-# ------------------- Strategy logic -------------------
 
-def ema(series: List[float], length: int) -> float:
+@lru_cache(maxsize=None)
+def _trend_weights(n: int) -> np.ndarray:
     """
-    Simple EMA implementation.
+    Rows giving the 20, 50 and min(200, n) bar EMAs of the closes
+    as one matmul over the last min(200, n) closes. Tiers always fetch the
+    same bar count, so this is built once per interval.
     """
-    if len(series) < length:
-        return series[-1]
-    k = 2 / (length + 1)
-    ema_val = series[-length]
-    for v in series[-length + 1:]:
-        ema_val = v * k + ema_val * (1 - k)
-    return ema_val
+    width = min(200, n)
+    weights = np.zeros((3, width), dtype=np.float64)
+    for row, length in enumerate((20, 50, width)):
+        if n < length:
+            # Not enough bars: the EMA falls back to the last close
+            weights[row, -1] = 1.0
+        else:
+            weights[row, width - length:] = _ema_weights(length)
+    return weights
+
+
+def _breakout_core(
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    vols: np.ndarray,
+    lookback_bars: int,
+    vol_length: int,
+    vol_multiplier: float,
+    max_range_pct: float,
+    min_avg_volume: float,
+) -> Tuple[bool, float, float]:
+    """
+    Numeric breakout filters over OHLCV columns (oldest→newest).
+    Returns (passed, range_pct, vol_multiple). Filters run cheapest first
+    and stop at the first failure, leaving later metrics at 0.0.
+    """
+    n = len(closes)
+    last_close = closes[-1]
+    if last_close == 0:
+        return False, 0.0, 0.0
+
+    # Bullish breakout candle (last bar only)
+    if not last_close > opens[-1]:
+        return False, 0.0, 0.0
+
+    # Volume: liquid enough, and spiking on the last bar
+    avg_vol = vols[-vol_length:].mean()
+    if avg_vol < min_avg_volume:
+        return False, 0.0, 0.0
+
+    last_vol = vols[-1]
+    vol_multiple = float(last_vol / avg_vol)
+    if not last_vol >= vol_multiplier * avg_vol:
+        return False, 0.0, vol_multiple
+
+    # Accumulation range over previous lookback_bars (excluding current bar)
+    start_idx = n - 1 - lookback_bars
+    end_idx = n - 1
+    hh = highs[start_idx:end_idx].max()
+    ll = lows[start_idx:end_idx].min()
+
+    range_pct = float((hh - ll) / last_close * 100.0)
+
+    # Tight base and break of structure
+    if not (range_pct <= max_range_pct and last_close > hh):
+        return False, range_pct, vol_multiple
+
+    # Trend filter (20 > 50 > 200 and price above 20 EMA), only for survivors
+    width = min(200, n)
+    ema20, ema50, ema200 = _trend_weights(n) @ closes[-width:]
+    if width == 50:
+        # Same EMA as ema50 (so ema50 > ema200 fails); the matmul rows can
+        # round differently, so reuse the value instead
+        ema200 = ema50
+    trend_ok = (last_close > ema20) and (ema20 > ema50) and (ema50 > ema200)
+
+    return bool(trend_ok), range_pct, vol_multiple
 
 
 def detect_breakout(
     symbol: str,
     interval: str,
-    candles: List[Candle],
+    candles: CandleBatch,
     lookback_bars: int = 20,
     vol_length: int = 20,
     vol_multiplier: float = 2.0,
@@ -176,48 +223,14 @@ def detect_breakout(
     if n < max(lookback_bars + 1, vol_length + 1, 50):
         return None
 
-    closes = [c.close for c in candles]
-    highs = [c.high for c in candles]
-    lows = [c.low for c in candles]
-    vols = [c.volume for c in candles]
-
-    last = candles[-1]
-    last_close = last.close
-    last_open = last.open
-    last_vol = last.volume
-
-    if last_close == 0:
-        return None
-
-    # Accumulation range over previous lookback_bars (excluding current bar)
-    start_idx = n - 1 - lookback_bars
-    end_idx = n - 1
-    hh = max(highs[start_idx:end_idx])
-    ll = min(lows[start_idx:end_idx])
-
-    range_pct = (hh - ll) / last_close * 100.0
-    is_consolidating = range_pct <= max_range_pct
-
-    # Volume
-    recent_vols = vols[-vol_length:]
-    avg_vol = sum(recent_vols) / len(recent_vols)
-    if avg_vol < min_avg_volume:
-        return None
-
-    vol_spike = last_vol >= vol_multiplier * avg_vol
-
-    # Break of structure & candle shape
-    price_breaks = last_close > hh
-    bullish_bar = last_close > last_open
-
-    # Trend filter (20 > 50 > 200 and price above 20 EMA)
-    ema20 = ema(closes, 20)
-    ema50 = ema(closes, 50)
-    ema200 = ema(closes, min(200, len(closes)))
-    trend_ok = (last_close > ema20) and (ema20 > ema50) and (ema50 > ema200)
+    passed, range_pct, vol_multiple = _breakout_core(
+        candles.open, candles.high, candles.low, candles.close, candles.volume,
+        lookback_bars, vol_length, vol_multiplier, max_range_pct, min_avg_volume,
+    )
 
-    if is_consolidating and vol_spike and price_breaks and bullish_bar and trend_ok:
-        vol_multiple = last_vol / avg_vol
+    if passed:
+        last_close = float(candles.close[-1])
+        last_time = candles.times[-1]
         
         # Calculate enhanced metrics
         atr_data = calculate_atr(candles, period=14)
@@ -230,7 +243,7 @@ def detect_breakout(
         # Add to position tracker if new entry
         if pyramid_signal.action == "INITIAL":
             position_tracker.add_position(
-                symbol, last_close, last.time, interval, risk_metrics.atr_stop
+                symbol, last_close, last_time, interval, risk_metrics.atr_stop
             )
         elif position_tracker.has_active_position(symbol):
             position_tracker.update_position(symbol, last_close)
@@ -242,7 +255,7 @@ def detect_breakout(
             ticker=symbol,
             interval=interval,
             price=last_close,
-            time=last.time,
+            time=last_time,
             range_pct=range_pct,
             volume_multiple=vol_multiple,
             atr_data=atr_data,
@@ -267,11 +280,12 @@ def scan_tier(tier_name: str, interval_override: Optional[str] = None) -> List[E
         raise ValueError(f"Unknown tier '{tier_name}'")
 
     tier_cfg = TIERS[tier_name]
-    symbols: List[str] = tier_cfg.get("symbols", [])
+    symbols: Collection[str] = tier_cfg.get("symbols", ())
     if not symbols:
         return []
 
     interval = interval_override or tier_cfg.get("interval", "5min")
+    breakout_params = tier_cfg.get("breakout", {})
     
     # Prioritize symbols to scan most important first
     # Limit based on remaining API calls
@@ -291,14 +305,24 @@ def scan_tier(tier_name: str, interval_override: Optional[str] = None) -> List[E
     
     print(f"[{tier_name}] Scanning {len(prioritized)}/{len(symbols)} symbols (FMP: {fmp_remaining}, Twelve: {twelve_remaining} remaining)")
 
+    # One batched fetch: cache hits, paid tiers fanned out on the client's
+    # pool, then a single Yahoo download for the rest. Detection stays on
+    # this thread (in priority order) so the position tracker is only
+    # touched from here
+    try:
+        values_by_symbol = api_client.fetch_candles_batch(prioritized, interval, outputsize=120)
+    except Exception as e:
+        print(f"[{tier_name}] Error fetching candles: {e}")
+        return []
+
     signals: List[EnhancedSignal] = []
     for symbol in prioritized:
+        values = values_by_symbol.get(symbol)
+        if not values:  # Skip if cache miss and API limit hit
+            continue
         try:
-            candles = fetch_candles(symbol, interval, outputsize=120)
-            if not candles:  # Skip if cache miss and API limit hit
-                continue
-                
-            sig = detect_breakout(symbol, interval, candles)
+            candles = CandleBatch.from_api(values)
+            sig = detect_breakout(symbol, interval, candles, **breakout_params)
             if sig:
                 sig.tier = tier_name
                 signals.append(sig)
@@ -322,7 +346,7 @@ def send_telegram(msg: str):
         "parse_mode": "Markdown",
     }
     try:
-        requests.post(url, json=payload, timeout=10)
+        _TG_SESSION.post(url, json=payload, timeout=10)
     except Exception as e:
         print(f"[send_telegram] Error sending message: {e}")
 
@@ -355,6 +379,7 @@ def main():
         fmp_api_key=FMP_API_KEY,
         twelve_data_key=TWELVE_DATA_API_KEY,
         alpha_vantage_key=ALPHA_VANTAGE_API_KEY,
+        pool_size=SCAN_WORKERS,
         cache_ttl_minutes={
             "1min": 2,   # 2 min cache for 1min data (more aggressive)
             "5min": 5,   # 5 min cache for 5min data (more aggressive)
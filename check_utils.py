@@ -0,0 +1,32 @@
+"""
+Shared helpers for the setup check scripts (test_api.py, test_telegram.py)
+"""
+
+import os
+import sys
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def make_session() -> requests.Session:
+    """
+    Keep-alive session for a handful of calls to one host. Connection errors,
+    timeouts and 5xx are retried up to 3 times (at once, then after 2s, 4s);
+    4xx fails straight away, and POSTs are never re-sent once the server
+    has answered.
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4,
+                                          max_retries=Retry(total=3, backoff_factor=1,
+                                                            status_forcelist=[500, 502, 503, 504])))
+    return session
+
+
+def require_env(*names, hint: str):
+    """Exit with status 2, before any HTTP work, if a required variable is unset."""
+    missing = [name for name in names if not os.getenv(name)]
+    if missing:
+        print(f"❌ ERROR: {', '.join(missing)} not set in .env file", file=sys.stderr)
+        print(hint, file=sys.stderr)
+        raise SystemExit(2)
@@ -6,13 +6,72 @@ fallback to Twelve Data, then Yahoo Finance if both fail.
 """
 
 import os
+import logging
+import threading
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from typing import Iterable, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import yfinance as yf
 import pandas as pd
-from api_optimizer import APICache, APIRateLimiter
+from api_optimizer import APICache, APIRateLimiter, _UNBILLED_ERRORS
+
+log = logging.getLogger("api")
+
+_PRICE_FIELDS = ("open", "high", "low", "close")
+
+# If FMP hasn't answered by then, ask Twelve Data too and take the first hit
+_HEDGE_AFTER_SECONDS = 3.0
+# ...unless Twelve Data is down to this many calls for the day; a hedge
+# bills both providers whenever FMP answers too, so keep some for fallback
+_HEDGE_TWELVE_RESERVE = 10
+
+# Stop waiting on FMP after this long (hedge or not) and fall to the next tier
+_FMP_GIVE_UP_SECONDS = 12.0
+# Longest Retry-After we'll sleep for; a longer throttle is better served by
+# the next tier than by parking a scan thread
+_MAX_RETRY_AFTER_SECONDS = 5.0
+
+# Per-thread flag set when the session starts retrying the current request
+_retrying = threading.local()
+
+
+class _TrackedRetry(Retry):
+    """
+    Retry that flags the calling thread's fetch as being in backoff and
+    caps Retry-After sleeps at _MAX_RETRY_AFTER_SECONDS
+    """
+    
+    def increment(self, *args, **kwargs):
+        flag = getattr(_retrying, "flag", None)
+        if flag is not None:
+            flag.set()
+        return super().increment(*args, **kwargs)
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, _MAX_RETRY_AFTER_SECONDS)
+
+
+def _to_numeric(candles: Iterable[Dict], time_key: str = "datetime") -> List[Dict]:
+    """Parse price/volume strings once before caching; drop malformed rows"""
+    parsed = []
+    for c in candles:
+        try:
+            row = {"datetime": c[time_key]}
+            for field in _PRICE_FIELDS:
+                row[field] = float(c[field])
+            row["volume"] = float(c.get("volume", 0))
+        except (KeyError, TypeError, ValueError):
+            continue
+        parsed.append(row)
+    return parsed
 
 
 class TripleAPIClient:
@@ -26,13 +85,46 @@ class TripleAPIClient:
     """
     
     def __init__(self, fmp_api_key: str, twelve_data_key: str, alpha_vantage_key: str = None,
-                 cache_ttl_minutes: Dict[str, int] = None):
+                 cache_ttl_minutes: Dict[str, int] = None, pool_size: int = 16):
         self.fmp_key = fmp_api_key
         self.twelve_key = twelve_data_key
         self.alpha_key = alpha_vantage_key
         
-        # Separate caches for each API
-        self.cache = APICache(cache_file="api_cache.json")
+        self.cache_ttl = cache_ttl_minutes or {
+            "1min": 2,
+            "5min": 5, 
+            "15min": 15,
+        }
+        
+        # Separate caches for each API; expired entries are kept for half a
+        # TTL so they can be served while a refresh runs in the background
+        self.cache = APICache(
+            cache_file="api_cache.sqlite",
+            stale_grace=max(self.cache_ttl.values()) * 30
+        )
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="refresh")
+        self._hedge_pool = ThreadPoolExecutor(max_workers=pool_size * 2, thread_name_prefix="hedge")
+        self.pool_size = pool_size
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        
+        # One keep-alive pool for every provider instead of a TLS handshake
+        # per request. 429s and gateway errors (502/503/504) get a short
+        # jittered backoff retry (honouring Retry-After) before we fall to the
+        # next tier; a plain 500 is usually permanent, so it isn't retried.
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_size,
+            max_retries=_TrackedRetry(
+                total=2,
+                backoff_factor=0.5,
+                backoff_jitter=0.5,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=["GET"],
+                respect_retry_after_header=True,
+            )
+        ))
         
         # Rate limiters
         self.fmp_limiter = APIRateLimiter(
@@ -54,20 +146,22 @@ class TripleAPIClient:
             usage_file="alpha_usage.json"
         )
         
-        self.cache_ttl = cache_ttl_minutes or {
-            "1min": 2,
-            "5min": 5, 
-            "15min": 15,
-        }
-        
         self.stats = {
             "fmp_calls": 0,
             "twelve_calls": 0,
             "alpha_calls": 0,
             "yahoo_calls": 0,
             "cache_hits": 0,
-            "errors": 0
+            "errors": 0,
+            "hedges": 0,
+            "hedge_double_billed": 0
         }
+        self._stats_lock = threading.Lock()
+    
+    def _count(self, key: str):
+        """Increment a stats counter (fetches may run on several threads)"""
+        with self._stats_lock:
+            self.stats[key] += 1
     
     def _interval_to_fmp(self, interval: str) -> str:
         """Convert interval to FMP format"""
@@ -82,22 +176,24 @@ class TripleAPIClient:
         return mapping.get(interval, "5min")
     
     def _fetch_from_fmp(self, symbol: str, interval: str, 
-                        outputsize: int = 120) -> Optional[List[Dict]]:
-        """Fetch candles from FMP API"""
+                        outputsize: int = 120,
+                        retrying: Optional[threading.Event] = None) -> Optional[List[Dict]]:
+        """Fetch candles from FMP API (retrying is set if the session retries)"""
+        _retrying.flag = retrying
         try:
-            if not self.fmp_limiter.can_make_call():
-                print(f"[FMP] Rate limit reached, falling back")
+            # Reserve the call up front so concurrent scans can't overshoot
+            if not self.fmp_limiter.try_acquire():
+                log.warning("[FMP] Rate limit reached, falling back")
                 return None
             
             fmp_interval = self._interval_to_fmp(interval)
             url = f"https://financialmodelingprep.com/api/v3/historical-chart/{fmp_interval}/{symbol}"
             params = {"apikey": self.fmp_key}
             
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
+            resp = self.session.get(url, params=params, timeout=10)
+            data = orjson.loads(resp.content)
             
-            self.fmp_limiter.record_call()
-            self.stats["fmp_calls"] += 1
+            self._count("fmp_calls")
             
             if isinstance(data, dict) and "Error Message" in data:
                 return None
@@ -105,31 +201,33 @@ class TripleAPIClient:
             if not isinstance(data, list) or len(data) == 0:
                 return None
             
-            data = list(reversed(data[:outputsize]))
-            converted = []
-            for candle in data:
-                converted.append({
-                    "datetime": candle.get("date", ""),
-                    "open": str(candle.get("open", 0)),
-                    "high": str(candle.get("high", 0)),
-                    "low": str(candle.get("low", 0)),
-                    "close": str(candle.get("close", 0)),
-                    "volume": str(candle.get("volume", 0))
-                })
+            # FMP is newest first and already numeric; one pass renames
+            # "date" and keeps the floats
+            converted = _to_numeric(reversed(data[:outputsize]), time_key="date")
             
-            print(f"[FMP SUCCESS] {symbol} {interval}")
+            log.info("[FMP SUCCESS] %s %s", symbol, interval)
             return converted
             
+        except _UNBILLED_ERRORS as e:
+            # Never completed (or still throttled after retries): don't
+            # charge the daily quota for it
+            self.fmp_limiter.release()
+            log.warning("[FMP] %s request failed, falling back: %s", symbol, e)
+            self._count("errors")
+            return None
         except Exception as e:
-            self.stats["errors"] += 1
+            self._count("errors")
             return None
+        finally:
+            _retrying.flag = None
     
     def _fetch_from_twelve(self, symbol: str, interval: str,
                           outputsize: int = 120) -> Optional[List[Dict]]:
         """Fetch candles from Twelve Data API (backup)"""
         try:
-            if not self.twelve_limiter.can_make_call():
-                print(f"[TwelveData] Rate limit reached")
+            # Reserve the call up front so concurrent scans can't overshoot
+            if not self.twelve_limiter.try_acquire():
+                log.warning("[TwelveData] Rate limit reached")
                 return None
             
             url = "https://api.twelvedata.com/time_series"
@@ -141,11 +239,10 @@ class TripleAPIClient:
                 "order": "ASC",
             }
             
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
+            resp = self.session.get(url, params=params, timeout=10)
+            data = orjson.loads(resp.content)
             
-            self.twelve_limiter.record_call()
-            self.stats["twelve_calls"] += 1
+            self._count("twelve_calls")
             
             if isinstance(data, dict) and data.get("status") == "error":
                 return None
@@ -154,11 +251,16 @@ class TripleAPIClient:
             if not values:
                 return None
             
-            print(f"[TwelveData BACKUP] {symbol} {interval}")
-            return values
+            log.info("[TwelveData BACKUP] %s %s", symbol, interval)
+            return _to_numeric(values)
             
+        except _UNBILLED_ERRORS as e:
+            self.twelve_limiter.release()
+            log.warning("[TwelveData] %s request failed: %s", symbol, e)
+            self._count("errors")
+            return None
         except Exception as e:
-            self.stats["errors"] += 1
+            self._count("errors")
             return None
 
     def _fetch_from_alpha(self, symbol: str, interval: str, outputsize: int = 120) -> Optional[List[Dict]]:
@@ -166,8 +268,9 @@ class TripleAPIClient:
         if not self.alpha_key: return None
         
         try:
-            if not self.alpha_limiter.can_make_call():
-                print(f"[Alpha Vantage] Rate limit reached")
+            # Reserve the call up front so concurrent scans can't overshoot
+            if not self.alpha_limiter.try_acquire():
+                log.warning("[Alpha Vantage] Rate limit reached")
                 return None
 
             # Alpha Vantage Intraday
@@ -183,10 +286,9 @@ class TripleAPIClient:
                 "outputsize": "compact" # returns 100
             }
 
-            resp = requests.get(url, params=params, timeout=15)
-            data = resp.json()
-            self.alpha_limiter.record_call()
-            self.stats["alpha_calls"] += 1
+            resp = self.session.get(url, params=params, timeout=15)
+            data = orjson.loads(resp.content)
+            self._count("alpha_calls")
             
             key_name = f"Time Series ({av_interval})"
             if key_name not in data:
@@ -209,12 +311,12 @@ class TripleAPIClient:
             candles.sort(key=lambda x: x["datetime"])
             candles = candles[-outputsize:]
             
-            print(f"[Alpha Vantage BACKUP] {symbol} {interval}")
-            return candles
+            log.info("[Alpha Vantage BACKUP] %s %s", symbol, interval)
+            return _to_numeric(candles)
 
         except Exception as e:
-            print(f"[Alpha Vantage Error] {symbol}: {e}")
-            self.stats["errors"] += 1
+            log.error("[Alpha Vantage Error] %s: %s", symbol, e)
+            self._count("errors")
             return None
     
     def _interval_to_yahoo(self, interval: str) -> str:
@@ -229,70 +331,249 @@ class TripleAPIClient:
         }
         return mapping.get(interval, "5m")
     
+    @staticmethod
+    def _yahoo_period(interval: str) -> str:
+        """History window that covers outputsize bars for an interval"""
+        if interval in ["1min", "5min"]: return "5d"
+        elif interval == "15min": return "1mo"
+        else: return "3mo"
+    
+    @staticmethod
+    def _yahoo_rows(df: pd.DataFrame, outputsize: int) -> Optional[List[Dict]]:
+        """Convert a Yahoo OHLCV frame to candle dicts (oldest→newest)"""
+        df = df.dropna(subset=["Open", "High", "Low", "Close"])
+        if df.empty: return None
+        
+        df = df.tail(outputsize)
+        times = df.index.strftime("%Y-%m-%d %H:%M:%S")
+        rows = df[["Open", "High", "Low", "Close", "Volume"]].fillna(0).to_numpy(dtype=float).tolist()
+        return [
+            {"datetime": ts, "open": o, "high": h, "low": l, "close": c, "volume": int(v)}
+            for ts, (o, h, l, c, v) in zip(times, rows)
+        ]
+    
     def _fetch_from_yahoo(self, symbol: str, interval: str,
                          outputsize: int = 120) -> Optional[List[Dict]]:
         """Fetch candles from Yahoo Finance (free, unlimited fallback)"""
         try:
             yahoo_interval = self._interval_to_yahoo(interval)
-            if interval in ["1min", "5min"]: period = "5d"
-            elif interval == "15min": period = "1mo"
-            else: period = "3mo"
+            period = self._yahoo_period(interval)
             
             ticker = yf.Ticker(symbol)
             df = ticker.history(period=period, interval=yahoo_interval)
             
             if df is None or df.empty: return None
             
-            df = df.tail(outputsize)
-            converted = []
-            for idx, row in df.iterrows():
-                converted.append({
-                    "datetime": idx.strftime("%Y-%m-%d %H:%M:%S"),
-                    "open": str(row["Open"]),
-                    "high": str(row["High"]),
-                    "low": str(row["Low"]),
-                    "close": str(row["Close"]),
-                    "volume": str(int(row["Volume"]))
-                })
+            converted = self._yahoo_rows(df, outputsize)
+            if converted is None: return None
             
-            self.stats["yahoo_calls"] += 1
-            print(f"[Yahoo Finance] {symbol} {interval}")
+            self._count("yahoo_calls")
+            log.info("[Yahoo Finance] %s %s", symbol, interval)
             return converted
             
         except Exception as e:
-            self.stats["errors"] += 1
+            self._count("errors")
             return None
     
+    def _fetch_batch_from_yahoo(self, symbols: List[str], interval: str,
+                                outputsize: int = 120) -> Dict[str, List[Dict]]:
+        """Fetch many symbols from Yahoo Finance in one multi-ticker download"""
+        if not symbols:
+            return {}
+        try:
+            df = yf.download(
+                tickers=symbols,
+                period=self._yahoo_period(interval),
+                interval=self._interval_to_yahoo(interval),
+                group_by="ticker",
+                auto_adjust=True,
+                threads=True,
+                progress=False,
+            )
+            if df is None or df.empty: return {}
+            
+            results = {}
+            for symbol in symbols:
+                if isinstance(df.columns, pd.MultiIndex):
+                    if symbol not in df.columns.get_level_values(0): continue
+                    sub = df[symbol]
+                else:
+                    sub = df
+                converted = self._yahoo_rows(sub, outputsize)
+                if converted:
+                    results[symbol] = converted
+            
+            self._count("yahoo_calls")
+            log.info("[Yahoo Finance] batch of %d %s, %d returned", len(symbols), interval, len(results))
+            return results
+            
+        except Exception as e:
+            log.error("[Yahoo Finance] batch error: %s", e)
+            self._count("errors")
+            return {}
+    
     def fetch_candles(self, symbol: str, interval: str,
                      outputsize: int = 120) -> Optional[List[Dict]]:
         """
         Fetch candles with multi-tier fallback: FMP → Twelve Data → Alpha Vantage → Yahoo Finance.
+        Entries expired by less than half a TTL are returned as-is while a
+        background refresh replaces them, so a TTL rollover doesn't stall the scan.
+        """
+        cached = self._from_cache(symbol, interval, outputsize)
+        if cached is not None:
+            return cached
+        
+        return self._fetch_and_cache(symbol, interval, outputsize)
+    
+    def fetch_candles_batch(self, symbols: List[str], interval: str,
+                            outputsize: int = 120) -> Dict[str, List[Dict]]:
+        """
+        Fetch many symbols at once. Cache hits are served first, the paid
+        tiers run concurrently per symbol, and whatever is still missing
+        goes to Yahoo Finance in a single multi-ticker download.
+        Returns dict of symbol -> candle dicts; failed symbols are omitted.
+        """
+        results: Dict[str, List[Dict]] = {}
+        misses: List[str] = []
+        for symbol in symbols:
+            cached = self._from_cache(symbol, interval, outputsize)
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                misses.append(symbol)
+        
+        if misses:
+            with ThreadPoolExecutor(max_workers=self.pool_size) as pool:
+                paid = pool.map(lambda s: self._fetch_paid(s, interval, outputsize), misses)
+                for symbol, data in zip(misses, paid):
+                    if data:
+                        results[symbol] = data
+                        self._store(symbol, interval, data)
+        
+        leftover = [s for s in misses if s not in results]
+        if leftover:
+            log.info("🆓 [Tier 4 Fallback] Yahoo Finance for %d symbols", len(leftover))
+            for symbol, data in self._fetch_batch_from_yahoo(leftover, interval, outputsize).items():
+                results[symbol] = data
+                self._store(symbol, interval, data)
+        
+        return results
+    
+    def _from_cache(self, symbol: str, interval: str,
+                    outputsize: int) -> Optional[List[Dict]]:
+        """
+        Fresh cached data, or data expired by less than half a TTL (with a
+        background refresh queued). None means the caller must fetch.
         """
         cached = self.cache.get(symbol, interval)
         if cached is not None:
-            self.stats["cache_hits"] += 1
+            self._count("cache_hits")
             return cached
         
-        # Tier 1: FMP
-        data = self._fetch_from_fmp(symbol, interval, outputsize)
+        stale = self.cache.get_stale(symbol, interval)
+        ttl_seconds = self.cache_ttl.get(interval, 5) * 60
+        if stale is not None and time.time() - stale.expires_at < ttl_seconds / 2:
+            self._count("cache_hits")
+            self._refresh_in_background(symbol, interval, outputsize)
+            return stale.data
+        
+        return None
+    
+    def _refresh_in_background(self, symbol: str, interval: str, outputsize: int):
+        """Queue one refresh per key; later stale reads don't queue more"""
+        key = (symbol, interval)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def refresh():
+            try:
+                self._fetch_and_cache(symbol, interval, outputsize)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+        
+        self._refresh_pool.submit(refresh)
+    
+    def _fetch_fmp_hedged(self, symbol: str, interval: str,
+                          outputsize: int) -> Tuple[Optional[List[Dict]], bool]:
+        """
+        Fetch from FMP; if it hasn't answered within _HEDGE_AFTER_SECONDS,
+        race it against Twelve Data. Returns (data, whether Twelve was tried).
+        No hedge while FMP is backing off (e.g. waiting out a 429's
+        Retry-After) or when Twelve Data is down to its reserve; then FMP
+        gets up to _FMP_GIVE_UP_SECONDS in total before we move on.
+        """
+        retrying = threading.Event()
+        fmp = self._hedge_pool.submit(self._fetch_from_fmp, symbol, interval, outputsize, retrying)
+        try:
+            return fmp.result(timeout=_HEDGE_AFTER_SECONDS), False
+        except FutureTimeout:
+            pass
+        
+        if retrying.is_set() or self.twelve_limiter.get_remaining_calls() <= _HEDGE_TWELVE_RESERVE:
+            try:
+                return fmp.result(timeout=_FMP_GIVE_UP_SECONDS - _HEDGE_AFTER_SECONDS), False
+            except FutureTimeout:
+                # Still throttled/stalled: let the next tiers have the symbol
+                log.warning("[FMP] Gave up waiting for %s, falling back", symbol)
+                return None, False
+        
+        log.info("[Hedge] FMP slow for %s, trying Twelve Data in parallel", symbol)
+        self._count("hedges")
+        twelve = self._hedge_pool.submit(self._fetch_from_twelve, symbol, interval, outputsize)
+        for future in as_completed([fmp, twelve]):
+            data = future.result()
+            if data is not None:
+                if future is twelve:
+                    # FMP can't be cancelled mid-request; it bills if it answers
+                    fmp.add_done_callback(lambda f: self._note_double_billed(symbol, f))
+                return data, True
+        return None, True
+    
+    def _note_double_billed(self, symbol: str, fmp_future):
+        """Count a hedge where FMP answered after Twelve Data already won"""
+        if fmp_future.result() is not None:
+            self._count("hedge_double_billed")
+            log.info("[Hedge] %s billed both FMP and Twelve Data", symbol)
+    
+    def _fetch_paid(self, symbol: str, interval: str,
+                    outputsize: int = 120) -> Optional[List[Dict]]:
+        """Walk the quota-limited tiers (FMP → Twelve Data → Alpha Vantage)"""
+        # Tier 1: FMP (Tier 2 joins in if FMP is slow)
+        data, twelve_tried = self._fetch_fmp_hedged(symbol, interval, outputsize)
         
         # Tier 2: Twelve Data
-        if data is None:
+        if data is None and not twelve_tried:
             data = self._fetch_from_twelve(symbol, interval, outputsize)
 
         # Tier 3: Alpha Vantage
         if data is None and self.alpha_key:
-             print(f"⚠️ [Tier 3 Fallback] Alpha Vantage for {symbol}")
+             log.info("⚠️ [Tier 3 Fallback] Alpha Vantage for %s", symbol)
              data = self._fetch_from_alpha(symbol, interval, outputsize)
         
+        return data
+    
+    def _store(self, symbol: str, interval: str, data: List[Dict]):
+        """Cache freshly fetched candles"""
+        ttl_minutes = self.cache_ttl.get(interval, 5)
+        self.cache.set(symbol, interval, data, ttl_minutes * 60)
+        self.cache.sweep_expired()
+        self.cache.flush_if_stale()
+    
+    def _fetch_and_cache(self, symbol: str, interval: str,
+                         outputsize: int = 120) -> Optional[List[Dict]]:
+        """Walk all API tiers and cache whatever comes back"""
+        data = self._fetch_paid(symbol, interval, outputsize)
+        
         # Tier 4: Yahoo Finance
         if data is None:
-            print(f"🆓 [Tier 4 Fallback] Yahoo Finance for {symbol}")
+            log.info("🆓 [Tier 4 Fallback] Yahoo Finance for %s", symbol)
             data = self._fetch_from_yahoo(symbol, interval, outputsize)
         
         if data:
-            ttl_minutes = self.cache_ttl.get(interval, 5)
-            self.cache.set(symbol, interval, data, ttl_minutes * 60)
+            self._store(symbol, interval, data)
         
         return data
     
@@ -303,12 +584,13 @@ class TripleAPIClient:
             "twelve_data": self.twelve_limiter.get_usage_stats(),
             "alpha_vantage": self.alpha_limiter.get_usage_stats(),
             "yahoo_finance": {"calls": self.stats["yahoo_calls"]},
-            "total_calls": sum(self.stats.values()) - self.stats["cache_hits"] - self.stats["errors"]
+            "total_calls": sum(v for k, v in self.stats.items() if k.endswith("_calls")),
+            "hedges": self.stats["hedges"],
+            "hedge_double_billed": self.stats["hedge_double_billed"]
         }
     
     def clear_cache(self):
-        self.cache.cache = {}
-        self.cache._save_cache()
+        self.cache.clear()
 
 # Backward compatibility alias
 DualAPIClient = TripleAPIClient
@@ -10,9 +10,92 @@ Implements advanced trading logic from:
 
 from dataclasses import dataclass
 from typing import List, Optional, Dict
-import json
+import orjson
 import os
-from datetime import datetime, timedelta
+import time
+
+import numpy as np
+
+
+@dataclass
+class CandleBatch:
+    """
+    OHLCV candles as columns (struct of arrays), sorted oldest→newest.
+    ohlcv has shape (n, 5): open, high, low, close, volume; column-major so
+    each field (e.g. closes) is a contiguous view.
+    """
+    times: List[str]
+    ohlcv: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.times)
+    
+    @property
+    def open(self) -> np.ndarray:
+        return self.ohlcv[:, 0]
+    
+    @property
+    def high(self) -> np.ndarray:
+        return self.ohlcv[:, 1]
+    
+    @property
+    def low(self) -> np.ndarray:
+        return self.ohlcv[:, 2]
+    
+    @property
+    def close(self) -> np.ndarray:
+        return self.ohlcv[:, 3]
+    
+    @property
+    def volume(self) -> np.ndarray:
+        return self.ohlcv[:, 4]
+    
+    @classmethod
+    def from_api(cls, values: List[Dict]) -> "CandleBatch":
+        """Build from API candle dicts, skipping malformed rows"""
+        # Providers hand back floats already, so try one bulk conversion
+        try:
+            ohlcv = np.array(
+                [(v["open"], v["high"], v["low"], v["close"], v.get("volume", 0.0))
+                 for v in values],
+                dtype=np.float64, order="F",
+            ).reshape(-1, 5)
+            if not np.isnan(ohlcv).any():
+                return cls(times=[v["datetime"] for v in values], ohlcv=ohlcv)
+        except (KeyError, TypeError, ValueError):
+            pass
+        
+        # Row-by-row fallback
+        times: List[str] = []
+        ohlcv = np.empty((len(values), 5), dtype=np.float64, order="F")
+        n = 0
+        for v in values:
+            try:
+                ohlcv[n] = (
+                    float(v["open"]),
+                    float(v["high"]),
+                    float(v["low"]),
+                    float(v["close"]),
+                    float(v.get("volume", 0.0)),
+                )
+                times.append(v["datetime"])
+            except Exception:
+                # Skip malformed row
+                continue
+            n += 1
+        
+        return cls(times=times, ohlcv=ohlcv[:n])
+
+
+def _as_batch(candles) -> CandleBatch:
+    """Pass a CandleBatch through; convert a list of candle objects (.time, .open, ... .volume)"""
+    if isinstance(candles, CandleBatch):
+        return candles
+    ohlcv = np.array(
+        [(c.open, c.high, c.low, c.close, c.volume) for c in candles],
+        dtype=np.float64, order="F",
+    ).reshape(-1, 5)
+    return CandleBatch(times=[c.time for c in candles], ohlcv=ohlcv)
 
 
 @dataclass
@@ -92,24 +175,62 @@ class EnhancedSignal:
     signal_strength: float  # 0-100
 
 
+# numpy scalars (e.g. np.float64 prices) serialize like plain floats
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY
+
+
 class PositionTracker:
-    """Track open positions for pyramiding logic"""
-    
-    def __init__(self, db_file: str = "positions.json"):
+    """
+    Track open positions for pyramiding logic.
+    Each change appends the ticker's record to a line-per-change log; the
+    JSON snapshot is only rewritten when the log is compacted.
+    Update/add/exit times are epoch nanoseconds.
+    """
+    
+    def __init__(self, db_file: str = "positions.json",
+                 compact_bytes: int = 4 * 1024 * 1024):
         self.db_file = db_file
+        self.log_file = os.path.splitext(db_file)[0] + ".log"
+        self.compact_bytes = compact_bytes
         self.positions: Dict = self._load_positions()
+        self._log = open(self.log_file, 'ab')
+        # Fold the replayed log into the snapshot (also drops a torn line)
+        if self._log.tell() > 0:
+            self.compact()
     
     def _load_positions(self) -> Dict:
-        """Load positions from file"""
+        """Load the snapshot, then replay logged changes on top of it"""
+        positions = {}
         if os.path.exists(self.db_file):
-            with open(self.db_file, 'r') as f:
-                return json.load(f)
-        return {}
-    
-    def _save_positions(self):
-        """Save positions to file"""
-        with open(self.db_file, 'w') as f:
-            json.dump(self.positions, f, indent=2)
+            with open(self.db_file, 'rb') as f:
+                positions = orjson.loads(f.read())
+        if os.path.exists(self.log_file):
+            with open(self.log_file, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = orjson.loads(line)
+                    except ValueError:
+                        # Torn last line from a crash mid-write
+                        continue
+                    positions[entry["ticker"]] = entry["position"]
+        return positions
+    
+    def _save_positions(self, ticker: str):
+        """Append one ticker's record to the log (O(1) in open positions)"""
+        self._log.write(orjson.dumps({"ticker": ticker, "position": self.positions[ticker]},
+                                     option=_ORJSON_OPTS) + b"\n")
+        self._log.flush()
+        if self._log.tell() > self.compact_bytes:
+            self.compact()
+    
+    def compact(self):
+        """Write a fresh snapshot and start an empty log"""
+        tmp_file = self.db_file + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(self.positions, option=_ORJSON_OPTS))
+        os.replace(tmp_file, self.db_file)
+        self._log.seek(0)
+        self._log.truncate()
     
     def add_position(self, ticker: str, entry_price: float, entry_time: str, 
                      interval: str, stop_loss: float):
@@ -123,15 +244,15 @@ class PositionTracker:
             "highest_price": entry_price,
             "status": "ACTIVE"
         }
-        self._save_positions()
+        self._save_positions(ticker)
     
     def update_position(self, ticker: str, current_price: float):
         """Update position with current price"""
         if ticker in self.positions:
             pos = self.positions[ticker]
             pos["highest_price"] = max(pos["highest_price"], current_price)
-            pos["last_update"] = datetime.now().isoformat()
-            self._save_positions()
+            pos["last_update"] = time.time_ns()
+            self._save_positions(ticker)
     
     def add_pyramid(self, ticker: str, add_price: float, add_pct: float):
         """Record pyramid addition"""
@@ -139,9 +260,9 @@ class PositionTracker:
             self.positions[ticker]["adds"].append({
                 "price": add_price,
                 "percent": add_pct,
-                "time": datetime.now().isoformat()
+                "time": time.time_ns()
             })
-            self._save_positions()
+            self._save_positions(ticker)
     
     def close_position(self, ticker: str, exit_price: float, reason: str):
         """Close position"""
@@ -149,8 +270,8 @@ class PositionTracker:
             self.positions[ticker]["status"] = "CLOSED"
             self.positions[ticker]["exit_price"] = exit_price
             self.positions[ticker]["exit_reason"] = reason
-            self.positions[ticker]["exit_time"] = datetime.now().isoformat()
-            self._save_positions()
+            self.positions[ticker]["exit_time"] = time.time_ns()
+            self._save_positions(ticker)
     
     def get_position(self, ticker: str) -> Optional[Dict]:
         """Get position data"""
@@ -162,34 +283,32 @@ class PositionTracker:
         return pos is not None and pos.get("status") == "ACTIVE"
 
 
-def calculate_atr(candles: List, period: int = 14) -> ATRData:
+def _true_range(high: np.ndarray, low: np.ndarray,
+                prev_close: np.ndarray) -> np.ndarray:
+    """Element-wise true range (broadcasts like a ufunc)"""
+    return np.maximum(high - low,
+                      np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def calculate_atr(candles: CandleBatch, period: int = 14) -> ATRData:
     """Calculate Average True Range"""
-    if len(candles) < period + 1:
+    batch = _as_batch(candles)
+    highs, lows, closes = batch.high, batch.low, batch.close
+    current_price = float(closes[-1])
+    
+    if len(closes) < period + 1:
         # Not enough data, use simple range
-        recent = candles[-period:]
-        avg_range = sum(c.high - c.low for c in recent) / len(recent)
-        current_price = candles[-1].close
+        avg_range = float((highs[-period:] - lows[-period:]).mean())
         return ATRData(
             atr=avg_range,
             atr_percent=(avg_range / current_price * 100) if current_price > 0 else 0
         )
     
-    true_ranges = []
-    for i in range(1, len(candles)):
-        high = candles[i].high
-        low = candles[i].low
-        prev_close = candles[i-1].close
-        
-        tr = max(
-            high - low,
-            abs(high - prev_close),
-            abs(low - prev_close)
-        )
-        true_ranges.append(tr)
+    # Only the last `period` true ranges feed the average
+    true_ranges = _true_range(highs[-period:], lows[-period:], closes[-period - 1:-1])
     
     # Simple moving average of true ranges
-    atr = sum(true_ranges[-period:]) / period
-    current_price = candles[-1].close
+    atr = float(true_ranges.sum() / period)
     
     return ATRData(
         atr=atr,
@@ -232,9 +351,10 @@ def calculate_risk_metrics(price: float, atr_data: ATRData,
     )
 
 
-def analyze_vpa_advanced(candles: List, volume_multiple: float) -> VPAAnalysis:
+def analyze_vpa_advanced(candles: CandleBatch, volume_multiple: float) -> VPAAnalysis:
     """Advanced Volume Price Analysis"""
-    if len(candles) < 20:
+    batch = _as_batch(candles)
+    if len(batch) < 20:
         return VPAAnalysis(
             volume_type="UNKNOWN",
             effort_vs_result="NEUTRAL",
@@ -242,8 +362,7 @@ def analyze_vpa_advanced(candles: List, volume_multiple: float) -> VPAAnalysis:
             strength_score=5.0
         )
     
-    recent_candles = candles[-20:]
-    last_candle = candles[-1]
+    recent = slice(-20, None)
     
     # Volume classification
     if volume_multiple >= 3.0:
@@ -256,8 +375,9 @@ def analyze_vpa_advanced(candles: List, volume_multiple: float) -> VPAAnalysis:
         volume_type = "STEADY"
     
     # Effort vs Result (Anna Coulling)
-    price_range = last_candle.high - last_candle.low
-    avg_range = sum(c.high - c.low for c in recent_candles[:-1]) / len(recent_candles[:-1])
+    ranges = batch.high[recent] - batch.low[recent]
+    price_range = ranges[-1]
+    avg_range = ranges[:-1].mean()
     
     # High volume + small range = potential reversal (effort without result)
     # High volume + large range = strong move (effort with result)
@@ -275,9 +395,8 @@ def analyze_vpa_advanced(candles: List, volume_multiple: float) -> VPAAnalysis:
         effort_vs_result = "NEUTRAL"
         strength = 5.0
     
-    # Volume trend
-    early_vol = sum(c.volume for c in recent_candles[:10]) / 10
-    late_vol = sum(c.volume for c in recent_candles[-10:]) / 10
+    # Volume trend: first vs second half of the window, in one reduction
+    early_vol, late_vol = batch.volume[recent].reshape(2, 10).mean(axis=1)
     
     if late_vol > early_vol * 1.3:
         volume_trend = "INCREASING"
@@ -296,48 +415,43 @@ def analyze_vpa_advanced(candles: List, volume_multiple: float) -> VPAAnalysis:
     )
 
 
+# (strategy, expiry_days, reasoning, strike multiplier) per interval bucket;
+# strikes run ATM, or 2% OTM for spreads
+_OPTIONS_TABLE = {
+    # Fast moves - consider shares first, then calls (weekly options)
+    "1min": ("SHARES_THEN_CALLS", 7,
+             "Fast 1m breakout - enter with shares, add calls on confirmation", 1.00),
+    # Intraday - ATM calls, or a spread when volatility is high
+    "5min_lowvol": ("CALL", 14, "Clean breakout - ATM calls for leverage", 1.00),
+    "5min_hivol": ("CALL_SPREAD", 14, "High volatility - use call spread to reduce cost", 1.02),
+}
+# 15min+ swing - give it time
+_OPTIONS_SWING = ("CALL", 30, "Swing setup - use monthly calls for time", 1.00)
+
+
 def generate_options_recommendation(price: float, atr_data: ATRData, 
                                     interval: str) -> OptionsRecommendation:
     """Generate options trading recommendation"""
-    atr_pct = atr_data.atr_percent
-    
-    # Determine strategy based on volatility and timeframe
-    if interval == "1min":
-        # Fast moves - consider shares first, then calls
-        strategy = "SHARES_THEN_CALLS"
-        expiry_days = 7  # Weekly options
-        reasoning = "Fast 1m breakout - enter with shares, add calls on confirmation"
-    elif interval == "5min":
-        # Intraday - ATM or slightly OTM calls
-        if atr_pct > 3.0:  # High volatility
-            strategy = "CALL_SPREAD"
-            expiry_days = 14
-            reasoning = "High volatility - use call spread to reduce cost"
-        else:
-            strategy = "CALL"
-            expiry_days = 14
-            reasoning = "Clean breakout - ATM calls for leverage"
-    else:  # 15min+
-        # Swing - give it time
-        strategy = "CALL"
-        expiry_days = 30
-        reasoning = "Swing setup - use monthly calls for time"
-    
-    # Strike selection: ATM to 5% OTM
-    if strategy == "CALL_SPREAD":
-        strike = price * 1.02  # 2% OTM
-    else:
-        strike = price * 1.00  # ATM
+    if interval == "5min":
+        interval = "5min_hivol" if atr_data.atr_percent > 3.0 else "5min_lowvol"
+    strategy, expiry_days, reasoning, strike_mult = _OPTIONS_TABLE.get(interval, _OPTIONS_SWING)
     
     return OptionsRecommendation(
         strategy=strategy,
-        strike=strike,
+        strike=price * strike_mult,
         expiry_days=expiry_days,
         reasoning=reasoning,
         iv_percentile=None  # Would need options data API
     )
 
 
+# Livermore add ladder, indexed by adds already made: (min profit %, action, reasoning)
+_PYRAMID_ADDS = (
+    (10.0, "ADD_25%", "Strong move +10% - add 25% to winner (Livermore)"),
+    (20.0, "ADD_50%", "Exceptional move +20% - final add 50% (Livermore)"),
+)
+
+
 def generate_pyramid_signal(ticker: str, current_price: float, 
                             position_tracker: PositionTracker,
                             atr_data: ATRData) -> PyramidSignal:
@@ -364,26 +478,19 @@ def generate_pyramid_signal(ticker: str, current_price: float,
             current_profit_pct=profit_pct
         )
     
-    # Add on strength (profit + new high)
-    num_adds = len(pos.get("adds", []))
-    
-    if profit_pct >= 10.0 and num_adds == 0:
-        # First add at +10%
-        return PyramidSignal(
-            action="ADD_25%",
-            reasoning="Strong move +10% - add 25% to winner (Livermore)",
-            current_profit_pct=profit_pct,
-            suggested_add_price=current_price
-        )
-    elif profit_pct >= 20.0 and num_adds == 1:
-        # Second add at +20%
-        return PyramidSignal(
-            action="ADD_50%",
-            reasoning="Exceptional move +20% - final add 50% (Livermore)",
-            current_profit_pct=profit_pct,
-            suggested_add_price=current_price
-        )
-    elif profit_pct >= 5.0:
+    # Add on strength (profit + new high): next rung of the ladder, if reached
+    num_adds = len(pos.get("adds", ()))
+    if num_adds < len(_PYRAMID_ADDS):
+        min_profit, action, reasoning = _PYRAMID_ADDS[num_adds]
+        if profit_pct >= min_profit:
+            return PyramidSignal(
+                action=action,
+                reasoning=reasoning,
+                current_profit_pct=profit_pct,
+                suggested_add_price=current_price
+            )
+    
+    if profit_pct >= 5.0:
         return PyramidSignal(
             action="HOLD",
             reasoning=f"In profit +{profit_pct:.1f}% - let it run",
@@ -397,36 +504,32 @@ def generate_pyramid_signal(ticker: str, current_price: float,
         )
 
 
+# Score tiers: points[searchsorted(thresholds, x)]. side="right" gives ">=",
+# side="left" gives "<=" at each threshold.
+_VOL_THRESH = np.array([1.5, 2.0, 3.0])
+_VOL_POINTS = np.array([0.0, 10.0, 15.0, 20.0])
+_RANGE_THRESH = np.array([1.0, 2.0, 3.0])
+_RANGE_POINTS = np.array([15.0, 10.0, 5.0, 0.0])
+_RR_THRESH = np.array([1.5, 2.0, 3.0])
+_RR_POINTS = np.array([0.0, 5.0, 10.0, 15.0])
+
+
+def calculate_signal_strength_batch(vpa_scores, volume_multiples,
+                                    range_pcts, rr_ratios) -> np.ndarray:
+    """Vectorized signal strength 0-100 for many signals at once"""
+    score = 50.0 + (np.asarray(vpa_scores, dtype=float) - 5.0) * 2  # -10 to +10
+    
+    # Volume (0-20), tight base (0-15), risk/reward (0-15)
+    score += _VOL_POINTS[np.searchsorted(_VOL_THRESH, volume_multiples, side="right")]
+    score += _RANGE_POINTS[np.searchsorted(_RANGE_THRESH, range_pcts, side="left")]
+    score += _RR_POINTS[np.searchsorted(_RR_THRESH, rr_ratios, side="right")]
+    
+    return np.clip(score, 0.0, 100.0)
+
+
 def calculate_signal_strength(vpa: VPAAnalysis, risk_metrics: RiskMetrics,
                               volume_multiple: float, range_pct: float) -> float:
     """Calculate overall signal strength 0-100"""
-    score = 50.0  # Base score
-    
-    # VPA contribution (0-20 points)
-    score += (vpa.strength_score - 5.0) * 2  # -10 to +10
-    
-    # Volume contribution (0-20 points)
-    if volume_multiple >= 3.0:
-        score += 20
-    elif volume_multiple >= 2.0:
-        score += 15
-    elif volume_multiple >= 1.5:
-        score += 10
-    
-    # Tight base contribution (0-15 points)
-    if range_pct <= 1.0:
-        score += 15
-    elif range_pct <= 2.0:
-        score += 10
-    elif range_pct <= 3.0:
-        score += 5
-    
-    # Risk/reward contribution (0-15 points)
-    if risk_metrics.risk_reward_ratio >= 3.0:
-        score += 15
-    elif risk_metrics.risk_reward_ratio >= 2.0:
-        score += 10
-    elif risk_metrics.risk_reward_ratio >= 1.5:
-        score += 5
-    
-    return min(100.0, max(0.0, score))
+    return float(calculate_signal_strength_batch(
+        [vpa.strength_score], [volume_multiple], [range_pct],
+        [risk_metrics.risk_reward_ratio])[0])
@@ -7,8 +7,13 @@ Organized by market cap and liquidity for optimal scanning.
 Total: ~1000 stocks across all tiers
 """
 
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, Tuple
+
 # S&P 500 - Technology (Ultra liquid, 1-minute scanning)
-SP500_TECH = [
+SP500_TECH = (
     "AAPL", "MSFT", "GOOGL", "GOOG", "AMZN", "NVDA", "META", "TSLA",
     "AVGO", "ORCL", "ADBE", "CRM", "CSCO", "ACN", "AMD", "INTC",
     "QCOM", "TXN", "INTU", "NOW", "AMAT", "MU", "PANW", "SNPS",
@@ -17,20 +22,20 @@ SP500_TECH = [
     "OKTA", "MDB", "TEAM", "WDAY", "VEEV", "DOCU", "ZM", "TWLO",
     "SHOP", "SQ", "UBER", "LYFT", "DASH", "RBLX", "U", "PINS",
     "SNAP", "SPOT", "ROKU", "TTD", "MTCH", "BMBL", "YELP", "CVNA",
-]
+)
 
 # Major ETFs & Indices (1-minute scanning)
-MAJOR_ETFS = [
+MAJOR_ETFS = (
     "SPY", "QQQ", "IWM", "DIA", "VTI", "VOO", "VEA", "VWO",
     "EEM", "EFA", "AGG", "BND", "LQD", "HYG", "TLT", "GLD",
     "SLV", "USO", "XLE", "XLF", "XLK", "XLV", "XLI", "XLP",
     "XLY", "XLU", "XLB", "XLRE", "XLC", "VNQ", "SMH", "SOXX",
     "ARKK", "ARKG", "ARKW", "ARKF", "ARKQ", "ARKX", "SQQQ", "TQQQ",
     "SPXL", "SPXS", "UPRO", "UDOW", "TNA", "TZA", "FAS", "FAZ",
-]
+)
 
 # S&P 500 - Large Cap (All sectors)
-SP500_LARGE_CAP = [
+SP500_LARGE_CAP = (
     # Consumer Discretionary
     "AMZN", "TSLA", "HD", "MCD", "NKE", "SBUX", "LOW", "TJX",
     "BKNG", "CMG", "MAR", "ABNB", "GM", "F", "DHI", "LEN",
@@ -84,10 +89,10 @@ SP500_LARGE_CAP = [
     # Communication Services
     "GOOGL", "META", "DIS", "NFLX", "CMCSA", "T", "VZ", "TMUS",
     "CHTR", "EA", "TTWO", "ATVI", "OMC", "IPG", "FOXA", "PARA",
-]
+)
 
 # Mid Cap Growth & Momentum
-MID_CAP_GROWTH = [
+MID_CAP_GROWTH = (
     "COIN", "HOOD", "SOFI", "AFRM", "UPST", "LC", "SQ", "PYPL",
     "RIVN", "LCID", "FSR", "GOEV", "PLUG", "FCEL", "BE", "BLNK",
     "CHPT", "EVGO", "ENPH", "SEDG", "RUN", "NOVA", "ARRY", "MAXN",
@@ -95,19 +100,19 @@ MID_CAP_GROWTH = [
     "DKNG", "PENN", "GENI", "FUBO", "MSGS", "BETZ", "RSI", "CZR",
     "MGM", "WYNN", "LVS", "MLCO", "BYD", "RCL", "CCL", "NCLH",
     "ALK", "UAL", "DAL", "AAL", "LUV", "JBLU", "SAVE", "HA",
-]
+)
 
 # Semiconductors Extended
-SEMICONDUCTORS_ALL = [
+SEMICONDUCTORS_ALL = (
     "NVDA", "AMD", "INTC", "QCOM", "AVGO", "TXN", "MU", "AMAT",
     "LRCX", "KLAC", "SNPS", "CDNS", "MRVL", "NXPI", "MCHP", "ADI",
     "ON", "MPWR", "SWKS", "QRVO", "WOLF", "CRUS", "SLAB", "ALGM",
     "NVMI", "COHU", "FORM", "UCTT", "MKSI", "ENTG", "ICHR", "ACLS",
     "ASML", "TSM", "UMC", "ASX", "HIMX", "SIMO", "DIOD", "POWI",
-]
+)
 
 # Biotech & Pharma Extended
-BIOTECH_PHARMA_ALL = [
+BIOTECH_PHARMA_ALL = (
     "MRNA", "BNTX", "NVAX", "VRTX", "REGN", "GILD", "BIIB", "AMGN",
     "SGEN", "EXAS", "ILMN", "INCY", "ALNY", "BMRN", "RARE", "FOLD",
     "ARWR", "IONS", "RGEN", "TECH", "VCEL", "BLUE", "CRSP", "EDIT",
@@ -115,63 +120,63 @@ BIOTECH_PHARMA_ALL = [
     "SRPT", "UTHR", "JAZZ", "HALO", "NBIX", "ACAD", "SAGE", "ALKS",
     "PTCT", "ITCI", "ARVN", "KRTX", "SAVA", "AXSM", "CORT", "LBPH",
     "KRYS", "PRTA", "TGTX", "AGIO", "APLS", "YMAB", "IMVT", "KYMR",
-]
+)
 
 # Software & Cloud Extended
-SOFTWARE_CLOUD = [
+SOFTWARE_CLOUD = (
     "MSFT", "ORCL", "ADBE", "CRM", "NOW", "INTU", "WDAY", "SNOW",
     "PLTR", "CRWD", "ZS", "DDOG", "NET", "OKTA", "MDB", "TEAM",
     "VEEV", "DOCU", "ZM", "TWLO", "SHOP", "SQ", "UBER", "LYFT",
     "DASH", "ABNB", "RBLX", "U", "PINS", "SNAP", "SPOT", "ROKU",
     "TTD", "MTCH", "BMBL", "YELP", "CVNA", "CARG", "CPNG", "SE",
     "MELI", "BABA", "JD", "PDD", "BIDU", "NIO", "XPEV", "LI",
-]
+)
 
 # Financial Technology
-FINTECH = [
+FINTECH = (
     "V", "MA", "PYPL", "SQ", "COIN", "HOOD", "SOFI", "AFRM",
     "UPST", "LC", "NU", "PAGS", "STNE", "MELI", "MARA", "RIOT",
     "CLSK", "HUT", "BITF", "ARBK", "WULF", "CIFR", "SI", "FOUR",
-]
+)
 
 # E-commerce & Digital
-ECOMMERCE_DIGITAL = [
+ECOMMERCE_DIGITAL = (
     "AMZN", "SHOP", "MELI", "SE", "CPNG", "BABA", "JD", "PDD",
     "EBAY", "ETSY", "W", "CHWY", "FTCH", "REAL", "RVLV", "VSCO",
-]
+)
 
 # Cybersecurity
-CYBERSECURITY = [
+CYBERSECURITY = (
     "CRWD", "ZS", "PANW", "FTNT", "NET", "OKTA", "S", "TENB",
     "CYBR", "QLYS", "VRNS", "RPD", "SAIL", "RBRK", "FSLY", "AKAM",
-]
+)
 
 # Cloud Infrastructure
-CLOUD_INFRA = [
+CLOUD_INFRA = (
     "AMZN", "MSFT", "GOOGL", "ORCL", "IBM", "CSCO", "ANET", "DELL",
     "HPE", "NTAP", "PSTG", "WDC", "STX", "MU", "SMCI", "NVDA",
-]
+)
 
 # Advertising & Media
-AD_MEDIA = [
+AD_MEDIA = (
     "GOOGL", "META", "TTD", "MGNI", "PUBM", "APPS", "DIS", "NFLX",
     "PARA", "WBD", "FOXA", "CMCSA", "OMC", "IPG", "ROKU", "SPOT",
-]
+)
 
 # Consumer Internet
-CONSUMER_INTERNET = [
+CONSUMER_INTERNET = (
     "GOOGL", "META", "NFLX", "UBER", "LYFT", "DASH", "ABNB", "BKNG",
     "EXPE", "TRIP", "YELP", "GRUB", "CVNA", "CARG", "VROOM", "KMX",
-]
+)
 
 # Healthcare Technology
-HEALTH_TECH = [
+HEALTH_TECH = (
     "TDOC", "DOCS", "ONEM", "HIMS", "ACCD", "LFST", "SDGR", "GDRX",
     "OSCR", "PHR", "TNDM", "DXCM", "PODD", "ISRG", "VEEV", "CERN",
-]
+)
 
 # Russell 1000 Additional Names
-RUSSELL_1000_ADDS = [
+RUSSELL_1000_ADDS = (
     "ABBV", "ACN", "ADBE", "ADP", "AIG", "ALL", "AMAT", "AMD",
     "AMT", "AMZN", "ANTM", "AON", "APD", "APH", "ASML", "ATVI",
     "AVB", "AVGO", "AXP", "AZO", "BA", "BAC", "BAX", "BDX",
@@ -187,10 +192,10 @@ RUSSELL_1000_ADDS = [
     "EW", "EXC", "EXPD", "EXPE", "EXR", "F", "FAST", "FB",
     "FBHS", "FCX", "FDX", "FE", "FFIV", "FIS", "FISV", "FITB",
     "FLT", "FMC", "FOX", "FOXA", "FRC", "FRT", "FTNT", "FTV",
-]
+)
 
 # Additional High Volume Stocks
-HIGH_VOLUME_ADDS = [
+HIGH_VOLUME_ADDS = (
     "GD", "GE", "GILD", "GIS", "GL", "GLW", "GM", "GNRC",
     "GOOG", "GPC", "GPN", "GPS", "GRMN", "GS", "GWW", "HAL",
     "HAS", "HBAN", "HBI", "HCA", "HD", "HES", "HIG", "HII",
@@ -203,35 +208,83 @@ HIGH_VOLUME_ADDS = [
     "KR", "L", "LDOS", "LEN", "LH", "LHX", "LIN", "LKQ",
     "LLY", "LMT", "LNC", "LNT", "LOW", "LRCX", "LUMN", "LUV",
     "LVS", "LW", "LYB", "LYV", "MA", "MAA", "MAR", "MAS",
-]
-
-# Combine all lists with strategic distribution
-ALL_STOCKS_1MIN = sorted(list(set(
-    SP500_TECH + MAJOR_ETFS + SEMICONDUCTORS_ALL[:20] + 
-    SOFTWARE_CLOUD[:30] + FINTECH[:15] + MID_CAP_GROWTH[:20]
-)))
-
-ALL_STOCKS_5MIN = sorted(list(set(
-    SP500_LARGE_CAP + MID_CAP_GROWTH + SEMICONDUCTORS_ALL +
-    BIOTECH_PHARMA_ALL[:40] + SOFTWARE_CLOUD + FINTECH +
-    ECOMMERCE_DIGITAL + CYBERSECURITY + CLOUD_INFRA[:15] +
-    AD_MEDIA[:15] + CONSUMER_INTERNET[:15] + HEALTH_TECH[:12]
-)))
-
-ALL_STOCKS_15MIN = sorted(list(set(
-    SP500_LARGE_CAP + BIOTECH_PHARMA_ALL + SOFTWARE_CLOUD +
-    SEMICONDUCTORS_ALL + FINTECH + ECOMMERCE_DIGITAL +
-    CYBERSECURITY + CLOUD_INFRA + AD_MEDIA + CONSUMER_INTERNET +
-    HEALTH_TECH + RUSSELL_1000_ADDS + HIGH_VOLUME_ADDS
-)))
+)
+
+# Sector lists (the cap/liquidity buckets above aren't sectors)
+_SECTOR_SOURCES = {
+    "tech": SP500_TECH,
+    "etf": MAJOR_ETFS,
+    "semis": SEMICONDUCTORS_ALL,
+    "biotech": BIOTECH_PHARMA_ALL,
+    "software": SOFTWARE_CLOUD,
+    "fintech": FINTECH,
+    "ecommerce": ECOMMERCE_DIGITAL,
+    "cyber": CYBERSECURITY,
+    "cloud": CLOUD_INFRA,
+    "media": AD_MEDIA,
+    "internet": CONSUMER_INTERNET,
+    "health_tech": HEALTH_TECH,
+}
+
+SECTOR_TO_TICKERS: Mapping[str, FrozenSet[str]] = MappingProxyType({
+    sector: frozenset(symbols) for sector, symbols in _SECTOR_SOURCES.items()
+})
+
+# A ticker can sit in several sectors (e.g. NVDA is tech and semis)
+_ticker_sectors = defaultdict(list)
+for _sector, _symbols in SECTOR_TO_TICKERS.items():
+    for _symbol in _symbols:
+        _ticker_sectors[_symbol].append(_sector)
+TICKER_TO_SECTORS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    symbol: tuple(sectors) for symbol, sectors in _ticker_sectors.items()
+})
+del _ticker_sectors, _sector, _symbols, _symbol
+
+# Tier membership: source lists (tuples, so slices stay cheap) per tier
+_TIER_SOURCES = {
+    "1min": (
+        SP500_TECH, MAJOR_ETFS, SEMICONDUCTORS_ALL[:20],
+        SOFTWARE_CLOUD[:30], FINTECH[:15], MID_CAP_GROWTH[:20],
+    ),
+    "5min": (
+        SP500_LARGE_CAP, MID_CAP_GROWTH, SEMICONDUCTORS_ALL,
+        BIOTECH_PHARMA_ALL[:40], SOFTWARE_CLOUD, FINTECH,
+        ECOMMERCE_DIGITAL, CYBERSECURITY, CLOUD_INFRA[:15],
+        AD_MEDIA[:15], CONSUMER_INTERNET[:15], HEALTH_TECH[:12],
+    ),
+    "15min": (
+        SP500_LARGE_CAP, BIOTECH_PHARMA_ALL, SOFTWARE_CLOUD,
+        SEMICONDUCTORS_ALL, FINTECH, ECOMMERCE_DIGITAL,
+        CYBERSECURITY, CLOUD_INFRA, AD_MEDIA, CONSUMER_INTERNET,
+        HEALTH_TECH, RUSSELL_1000_ADDS, HIGH_VOLUME_ADDS,
+    ),
+}
+
+# Combine all lists with strategic distribution (unordered; the scanner
+# prioritizes before scanning, use sorted_tier() for a stable order).
+# Read-only all the way down: a proxy over frozensets.
+UNIVERSE: Mapping[str, FrozenSet[str]] = MappingProxyType({
+    tier: frozenset().union(*sources) for tier, sources in _TIER_SOURCES.items()
+})
+ALL_STOCKS_1MIN = UNIVERSE["1min"]
+ALL_STOCKS_5MIN = UNIVERSE["5min"]
+ALL_STOCKS_15MIN = UNIVERSE["15min"]
+
+
+@lru_cache(maxsize=3)
+def sorted_tier(name: str) -> Tuple[str, ...]:
+    """Alphabetical symbols of a tier ("1min", "5min" or "15min")"""
+    return tuple(sorted(UNIVERSE[name]))
+
 
 # Print statistics
 if __name__ == "__main__":
     print(f"1-minute tier: {len(ALL_STOCKS_1MIN)} stocks")
     print(f"5-minute tier: {len(ALL_STOCKS_5MIN)} stocks")
     print(f"15-minute tier: {len(ALL_STOCKS_15MIN)} stocks")
-    total_unique = len(set(ALL_STOCKS_1MIN + ALL_STOCKS_5MIN + ALL_STOCKS_15MIN))
+    total_unique = len(ALL_STOCKS_1MIN | ALL_STOCKS_5MIN | ALL_STOCKS_15MIN)
     print(f"Total unique stocks: {total_unique}")
-    print(f"\nSample 1m stocks: {ALL_STOCKS_1MIN[:10]}")
-    print(f"Sample 5m stocks: {ALL_STOCKS_5MIN[:10]}")
-    print(f"Sample 15m stocks: {ALL_STOCKS_15MIN[:10]}")
+    print(f"Sectors: {', '.join(f'{k} ({len(v)})' for k, v in SECTOR_TO_TICKERS.items())}")
+    print(f"\nSample 1m stocks: {list(sorted_tier('1min')[:10])}")
+    print(f"Sample 5m stocks: {list(sorted_tier('5min')[:10])}")
+    print(f"Sample 15m stocks: {list(sorted_tier('15min')[:10])}")
@@ -6,16 +6,80 @@ Tests your Twelve Data API key and fetches sample stock data.
 Usage:
 1. Add TWELVE_DATA_API_KEY to your .env file
 2. Run: python test_api.py
+
+Responses are cached on disk for TEST_API_CACHE_SECONDS (default 60) so
+repeat runs don't spend quota; pass --fresh (or set it to 0) for live calls.
 """
 
 import os
+import sys
+import time
+import shutil
+import hashlib
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import requests
+from check_utils import make_session, require_env
 
 load_dotenv()
 
 TWELVE_DATA_API_KEY = os.getenv("TWELVE_DATA_API_KEY")
 
+# Keep-alive pool to api.twelvedata.com shared by both probes (retry policy
+# in check_utils). Twelve Data reports a bad key or spent quota as a
+# "status": "error" body, which the probes below report instead of retrying.
+SESSION = make_session()
+
+CACHE_DIR = ".test_api_cache"
+CACHE_SECONDS = float(os.getenv("TEST_API_CACHE_SECONDS", "60"))
+
+def _get_json(url, params):
+    """
+    GET url and decode JSON, reusing a recent good response from disk.
+    Returns (data, age in seconds if served from cache else None).
+    """
+    key = hashlib.sha1(orjson.dumps([url, params], option=orjson.OPT_SORT_KEYS)).hexdigest()
+    path = os.path.join(CACHE_DIR, key + ".json")
+    if CACHE_SECONDS > 0 and os.path.exists(path):
+        age = time.time() - os.path.getmtime(path)
+        if age < CACHE_SECONDS:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read()), age
+    
+    resp = SESSION.get(url, params=params, timeout=10)
+    data = orjson.loads(resp.content)
+    # Errors are never cached so a fixed key/limit is re-checked next run
+    if CACHE_SECONDS > 0 and not (isinstance(data, dict) and data.get("status") == "error"):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(resp.content)
+    return data, None
+
+def _print_cache_notice(age):
+    """Make clear a cached answer is not a live connectivity check."""
+    if age is not None:
+        print(f"   ♻️  Served from cache ({age:.0f}s old) - run with --fresh for a live check")
+
+def _fetch_quote():
+    """GET an AAPL quote."""
+    url = "https://api.twelvedata.com/quote"
+    params = {
+        "symbol": "AAPL",
+        "apikey": TWELVE_DATA_API_KEY,
+    }
+    return _get_json(url, params)
+
+def _fetch_timeseries():
+    """GET the last few SPY 5min candles."""
+    url = "https://api.twelvedata.com/time_series"
+    params = {
+        "symbol": "SPY",
+        "interval": "5min",
+        "outputsize": 5,
+        "apikey": TWELVE_DATA_API_KEY,
+    }
+    return _get_json(url, params)
+
 def test_api():
     """Test Twelve Data API connection and fetch sample data."""
     
@@ -28,16 +92,16 @@ def test_api():
     
     print(f"✅ API Key: {TWELVE_DATA_API_KEY[:10]}...\n")
     
+    # Both probes are independent, so send them together and report in order
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        quote_future = ex.submit(_fetch_quote)
+        series_future = ex.submit(_fetch_timeseries)
+    
     # Test API with a simple quote request
     print("📡 Fetching AAPL quote...")
     try:
-        url = "https://api.twelvedata.com/quote"
-        params = {
-            "symbol": "AAPL",
-            "apikey": TWELVE_DATA_API_KEY,
-        }
-        resp = requests.get(url, params=params, timeout=10)
-        data = resp.json()
+        data, age = quote_future.result()
+        _print_cache_notice(age)
         
         if isinstance(data, dict) and data.get("status") == "error":
             print(f"❌ API Error: {data.get('message')}")
@@ -60,15 +124,8 @@ def test_api():
     # Test time series data
     print("\n📊 Fetching time series data...")
     try:
-        url = "https://api.twelvedata.com/time_series"
-        params = {
-            "symbol": "SPY",
-            "interval": "5min",
-            "outputsize": 5,
-            "apikey": TWELVE_DATA_API_KEY,
-        }
-        resp = requests.get(url, params=params, timeout=10)
-        data = resp.json()
+        data, age = series_future.result()
+        _print_cache_notice(age)
         
         if isinstance(data, dict) and data.get("status") == "error":
             print(f"❌ API Error: {data.get('message')}")
@@ -90,11 +147,16 @@ def test_api():
     return True
 
 if __name__ == "__main__":
+    require_env("TWELVE_DATA_API_KEY", hint="Get a free API key at: https://twelvedata.com/")
+    
     print("=" * 60)
     print("  TWELVE DATA API TEST")
     print("=" * 60)
     print()
     
+    if "--fresh" in sys.argv[1:]:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    
     success = test_api()
     
     print("\n" + "=" * 60)
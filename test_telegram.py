@@ -15,8 +15,10 @@ This will send a test message to your Telegram chat.
 """
 
 import os
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import requests
+from check_utils import make_session, require_env
 
 # Load environment variables
 load_dotenv()
@@ -24,6 +26,26 @@ load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
+# Keep-alive pool to api.telegram.org shared by both calls (retry policy in
+# check_utils); a bad token fails straight away and the test message is
+# never re-sent once Telegram has answered.
+SESSION = make_session()
+
+def _get_me():
+    """GET the bot's own profile."""
+    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getMe"
+    return orjson.loads(SESSION.get(url, timeout=10).content)
+
+def _send_test_message():
+    """POST the test message to the configured chat."""
+    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    payload = {
+        "chat_id": TELEGRAM_CHAT_ID,
+        "text": "🎉 *Test Message*\n\nYour stock screener bot is configured correctly!\n\nYou should receive breakout alerts here when the scanner detects opportunities.",
+        "parse_mode": "Markdown",
+    }
+    return orjson.loads(SESSION.post(url, json=payload, timeout=10).content)
+
 def test_telegram():
     """Send a test message to verify Telegram configuration."""
     
@@ -41,12 +63,15 @@ def test_telegram():
     print(f"✅ Bot Token: {TELEGRAM_BOT_TOKEN[:20]}...")
     print(f"✅ Chat ID: {TELEGRAM_CHAT_ID}\n")
     
+    # Both calls go out together (a bad token fails both), then report in order
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        me_future = ex.submit(_get_me)
+        send_future = ex.submit(_send_test_message)
+    
     # Test bot info
     print("📡 Testing bot connection...")
     try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getMe"
-        resp = requests.get(url, timeout=10)
-        data = resp.json()
+        data = me_future.result()
         
         if data.get("ok"):
             bot_info = data.get("result", {})
@@ -62,14 +87,7 @@ def test_telegram():
     # Send test message
     print("\n📤 Sending test message...")
     try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        payload = {
-            "chat_id": TELEGRAM_CHAT_ID,
-            "text": "🎉 *Test Message*\n\nYour stock screener bot is configured correctly!\n\nYou should receive breakout alerts here when the scanner detects opportunities.",
-            "parse_mode": "Markdown",
-        }
-        resp = requests.post(url, json=payload, timeout=10)
-        data = resp.json()
+        data = send_future.result()
         
         if data.get("ok"):
             print("✅ Test message sent successfully!")
@@ -86,6 +104,9 @@ def test_telegram():
         return False
 
 if __name__ == "__main__":
+    require_env("TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID",
+                hint="See TELEGRAM_SETUP.md for detailed instructions")
+    
     print("=" * 60)
     print("  TELEGRAM BOT CONFIGURATION TEST")
     print("=" * 60)
@@ -0,0 +1,55 @@
+"""APICache adaptive TTL bounds"""
+
+import atexit
+import os
+import sys
+import tempfile
+import unittest
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_optimizer import APICache, _MIN_ADAPTIVE_TTL
+
+
+class AdaptiveTTLTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = APICache(cache_file=os.path.join(self.tmp.name, "cache.sqlite"))
+    
+    def tearDown(self):
+        atexit.unregister(self.cache._save_cache)
+        self.cache._db.close()
+        self.tmp.cleanup()
+    
+    def _ttl_for_gap(self, gap: float, ttl_seconds: float) -> float:
+        key = ("AAPL", "5min")
+        self.cache.access_log[key] = deque(1000.0 + i * gap for i in range(8))
+        return self.cache._adaptive_ttl(key, ttl_seconds)
+    
+    def test_never_exceeds_configured_ttl(self):
+        for ttl_seconds in (60, 120, 300, 900):
+            for gap in (1, 7.5, 20, 29, 30, 45, 59, 60, 61, 100, 119, 120, 299, 300, 1000):
+                ttl = self._ttl_for_gap(gap, ttl_seconds)
+                self.assertLessEqual(ttl, ttl_seconds, (gap, ttl_seconds))
+                self.assertGreaterEqual(ttl, min(ttl_seconds, _MIN_ADAPTIVE_TTL), (gap, ttl_seconds))
+    
+    def test_previously_stretched_cases(self):
+        # Used to come out at 150s and 75s
+        self.assertEqual(self._ttl_for_gap(60, 120), 90)
+        self.assertEqual(self._ttl_for_gap(30, 60), 45)
+    
+    def test_expires_between_reads(self):
+        # 40s cadence: the midpoint after the 280s read is exactly the budget.
+        # 50s cadence: the one after 300s would be 325s, so use 275s
+        self.assertEqual(self._ttl_for_gap(40, 300), 300)
+        self.assertEqual(self._ttl_for_gap(50, 300), 275)
+    
+    def test_too_few_reads_uses_configured_ttl(self):
+        key = ("MSFT", "5min")
+        self.cache.access_log[key] = deque([1000.0, 1010.0])
+        self.assertEqual(self.cache._adaptive_ttl(key, 300), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()